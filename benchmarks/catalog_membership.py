@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# Compares adding, removing and toggling games in a catalog list with plain lists and with ordered sets
+#
+# python benchmarks/catalog_membership.py [catalog sizes]
+#
+# Each catalog is made of synthetic games, split across authors like the real catalog
+
+import os, sys, time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+os.chdir(root)
+
+from manage import pret_manager, Catalog, BaseListEntry
+from src.FilterEngine import GameIndex
+
+class Game:
+    def __init__(self, i):
+        self.author = 'author{0}'.format(i % 50)
+        self.title = 'game{0}'.format(i)
+
+# the previous implementation, which searched the lists for every membership check and removal
+class LegacyListEntry(BaseListEntry):
+    def reset(self):
+        self.GameStructure = {}
+        self.GameList = []
+
+    def has(self, game):
+        return game in self.GameList
+
+    def addGame(self, game):
+        if game not in self.GameList:
+            self.GameList.append(game)
+
+        if game.author not in self.GameStructure:
+            self.GameStructure[game.author] = [game.title]
+        else:
+            self.GameStructure[game.author].append(game.title)
+
+    def removeGame(self, game):
+        if game in self.GameList:
+            self.GameList.pop(self.GameList.index(game))
+
+        self.GameStructure[game.author].pop( self.GameStructure[game.author].index(game.title) )
+        if not self.GameStructure[game.author]:
+            del self.GameStructure[game.author]
+
+def measure(entryClass, games):
+    catalog = Catalog(pret_manager.Catalogs, 'Benchmark', entryClass)
+    catalog.add('Benchmark')
+    entry = catalog.get('Benchmark')
+    entry.reset()
+
+    times = []
+
+    # add everything, like adding all games to the queue
+    start = time.perf_counter()
+    entry.addGames(games)
+    times.append(time.perf_counter() - start)
+
+    # toggle every other game, like a search which excludes half of the catalog
+    start = time.perf_counter()
+    entry.toggleGames(games[::2])
+    times.append(time.perf_counter() - start)
+
+    # remove everything
+    start = time.perf_counter()
+    entry.removeGames(games)
+    times.append(time.perf_counter() - start)
+
+    return times
+
+if __name__ == '__main__':
+    sizes = [int(size) for size in sys.argv[1:]] or [1000, 10000]
+
+    for size in sizes:
+        games = [Game(i) for i in range(size)]
+
+        # the catalog lists keep the bits of their games, so each game needs a position like in the manager
+        index = GameIndex()
+        for game in games:
+            index.add(game)
+
+        print('{0} games'.format(size))
+        for name, entryClass in [('list', LegacyListEntry), ('ordered set', BaseListEntry)]:
+            add, toggle, remove = measure(entryClass, games)
+            print('    {0:<12} add {1:8.4f}s   toggle {2:8.4f}s   remove {3:8.4f}s'.format(name, add, toggle, remove))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# Compares compiling the browser filters with lists of games and with bitsets
+#
+# python benchmarks/filter_engine.py [catalog sizes]
+#
+# The filter is a search matching every game, AND one of 20 tags, OR one of 50 authors, and NOT a favorites list,
+# and each step adds one more list to it, like clicking on catalog entries in the browser
+
+import os, sys, time, random
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+from src.FilterEngine import GameIndex, FilterEngine
+
+class Game:
+    pass
+
+class List:
+    def __init__(self, index, games):
+        self.Games = games
+        self.Bits = index.bits(games)
+
+    def getData(self):
+        return self.Games[:]
+
+    def getBits(self):
+        return self.Bits
+
+# the previous implementation, which kept the games of each type as lists and checked each game against them
+class ListFilter:
+    def __init__(self):
+        self.OR_Lists, self.OR_Games = [], []
+        self.AND_Lists, self.AND_Games = [], []
+        self.NOT_Lists, self.NOT_Games = [], []
+        self.All_Games = []
+
+    def is_game_valid(self, game):
+        if self.OR_Lists:
+            if self.AND_Lists:
+                return game in self.OR_Games and game in self.AND_Games and game not in self.NOT_Games
+            return game in self.OR_Games and game not in self.NOT_Games
+        elif self.AND_Lists:
+            return game in self.AND_Games and game not in self.NOT_Games
+        return False
+
+    def compile(self):
+        for game in self.All_Games[:]:
+            if not self.is_game_valid(game):
+                self.All_Games.pop(self.All_Games.index(game))
+
+        for game in self.OR_Games if self.OR_Lists else self.AND_Games:
+            if self.is_game_valid(game) and game not in self.All_Games:
+                self.All_Games.append(game)
+
+    def add(self, list, type):
+        getattr(self, type + '_Lists').append(list)
+        games = getattr(self, type + '_Games')
+
+        if type == 'AND' and len(self.AND_Lists) > 1:
+            data = list.getData()
+            for game in games[:]:
+                if game not in data:
+                    games.pop(games.index(game))
+        else:
+            for game in list.getData():
+                if game not in games:
+                    games.append(game)
+
+        self.compile()
+
+def create_lists(size):
+    index = GameIndex()
+    games = [Game() for i in range(size)]
+    for game in games:
+        index.add(game)
+
+    random.seed(size)
+    search = List(index, games)
+    tag = List(index, random.sample(games, size // 20))
+    authors = [List(index, games[i::50]) for i in range(3)]
+    favorites = List(index, random.sample(games, size // 100))
+
+    return index, [(search, 'AND'), (authors[0], 'OR'), (authors[1], 'OR'), (favorites, 'NOT'), (tag, 'AND'), (authors[2], 'OR')]
+
+def measure_lists(steps):
+    filter = ListFilter()
+    start = time.perf_counter()
+    for list, type in steps:
+        filter.add(list, type)
+    return time.perf_counter() - start, len(filter.All_Games)
+
+def measure_bits(index, steps):
+    filter = FilterEngine(index)
+    shown = 0
+    changed = 0
+
+    start = time.perf_counter()
+    for list, type in steps:
+        filter.add(list, type)
+        filter.compile()
+        hide, show = filter.delta(shown)
+        shown = filter.Bits
+        changed += len(hide) + len(show)
+    return time.perf_counter() - start, len(filter.games()), changed
+
+if __name__ == '__main__':
+    sizes = [int(size) for size in sys.argv[1:]] or [1000, 10000]
+
+    for size in sizes:
+        index, steps = create_lists(size)
+        elapsed, count = measure_lists(steps)
+        print('{0:6} games   lists   {1:8.4f}s   {2} shown'.format(size, elapsed, count))
+        elapsed, count, changed = measure_bits(index, steps)
+        print('{0:6} games   bitsets {1:8.4f}s   {2} shown, {3} tiles changed'.format(size, elapsed, count, changed))
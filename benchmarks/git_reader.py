@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# Compares reading the branch, commit, date and url of each repository with git processes and with the in-process reader
+#
+# python benchmarks/git_reader.py [repository paths]
+#
+# Without any paths, every repository of the catalog which has been cloned is used
+# If none have been cloned, this repository is read once for each entry of the catalog instead
+
+import os, sys, time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+os.chdir(root)
+
+from manage import pret_manager
+from src.Environment import Git
+
+def get_repos():
+    pret_manager.init()
+    repos = [repo for repo in pret_manager.All if repo.Type != "patch"]
+
+    if len(sys.argv) > 1:
+        paths = sys.argv[1:]
+    else:
+        paths = [repo.path['repo'] for repo in repos if os.path.exists(repo.path['repo'])]
+
+        if not paths:
+            print('No cloned repositories found, reading this repository {0} times'.format(len(repos)))
+            paths = ['.'] * len(repos)
+
+    # point a repository object at each path, so the same methods as the manager are used
+    for repo, path in zip(repos, paths):
+        repo.path['repo'] = path
+        repo.git = Git(repo)
+
+    return repos[:len(paths)]
+
+# the queries made for each repository when the manager starts
+def startup(repos):
+    for repo in repos:
+        repo.get_current_branch_info()
+
+# the queries made for each repository when refreshing and building
+def refresh(repos):
+    for repo in repos:
+        repo.get_url()
+        repo.get_commit()
+        repo.get_date()
+
+def measure(name, handler, repos):
+    results = []
+    for useReader in [False, True]:
+        Git.UseReader = useReader
+        start = time.perf_counter()
+        handler(repos)
+        results.append(time.perf_counter() - start)
+
+    print('{0:<8} {1} repositories   git: {2:7.3f}s   reader: {3:7.3f}s   ({4:.1f}x faster)'.format(name, len(repos), results[0], results[1], results[0] / results[1]))
+
+if __name__ == '__main__':
+    repos = get_repos()
+
+    measure('startup', startup, repos)
+    measure('refresh', refresh, repos)
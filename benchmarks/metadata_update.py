@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# Measures the cost of updating the metadata of a repository with a large tag list
+#
+# python benchmarks/metadata_update.py [tags] [updates]
+
+import os, sys, copy, time, tempfile
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+os.chdir(root)
+
+from manage import pret_manager
+from src.StateStore import StateStore
+from src.CatalogCache import CatalogCache
+
+# the previous implementation, which copied and compared every property on every update
+def deepcopy_update(repo):
+    for name in repo.MetaDataProperties:
+        value = copy.deepcopy(getattr(repo, name))
+        if value != repo.MetaData.get(name):
+            repo.MetaData[name] = value
+
+def measure(name, handler, count):
+    start = time.perf_counter()
+    for i in range(count):
+        handler(i)
+    elapsed = time.perf_counter() - start
+    print('{0:<28} {1:8.3f}ms per update'.format(name, 1000 * elapsed / count))
+
+if __name__ == '__main__':
+    tags = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    # dont write to the real state database, and always start from an empty catalog cache so the results do not depend on previous runs
+    directory = tempfile.mkdtemp()
+    pret_manager.StateStore = StateStore(pret_manager, directory + '/state.db', [])
+    pret_manager.CatalogCache = CatalogCache(pret_manager, directory + '/catalog.cache')
+    pret_manager.init()
+
+    repo = [repo for repo in pret_manager.All if repo.Type != "patch"][0]
+    # load the metadata now, so it is not loaded within the measurements
+    repo.hydrate()
+    repo.GitTags = { 'v{0}'.format(i) : { 'commit' : '{0:040x}'.format(i), 'date' : '2024-01-01 00:00:00 +0000' } for i in range(tags) }
+    repo.Branches = { 'branch{0}'.format(i) : { 'LastCommit' : '{0:040x}'.format(i), 'LastRemoteCommit' : '{0:040x}'.format(i) } for i in range(50) }
+    repo.updateMetaData()
+
+    print('Repository with {0} tags and {1} branches'.format(tags, len(repo.Branches)))
+
+    measure('deepcopy and compare', lambda i: deepcopy_update(repo), count)
+    measure('tracked, unchanged', lambda i: repo.updateMetaData(), count)
+
+    def modify(i):
+        repo.get_branch_data('branch0')['LastCommit'] = '{0:040x}'.format(i)
+        repo.updateMetaData()
+
+    measure('tracked, branch modified', modify, count)
+
+    def coalesced(i):
+        with repo.coalesceMetaData():
+            for j in range(10):
+                modify(i * 10 + j)
+
+    measure('coalesced, 10 modifications', coalesced, count)
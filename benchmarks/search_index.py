@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# Compares matching each keystroke of a search against every game, and against the trigram index
+#
+# python benchmarks/search_index.py [catalog sizes]
+#
+# The catalog is the real one, repeated with new titles until it has the given number of games,
+# and each keystroke only checks the games which could still match, like SearchEntry
+
+import os, sys, json, time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+from src.FilterEngine import GameIndex
+from src.SearchIndex import SearchIndex
+
+class Game:
+    def __init__(self, author, title, data):
+        self.author = author
+        self.FullTitle = data.get('title', title + ' (' + author + ')')
+        self.Description = data.get('description', '')
+        self.tags = data.get('tags', [])
+        self.Data = data
+
+    def get_search_text(self):
+        return '\n'.join([self.FullTitle, self.Description, self.author, *self.tags, self.Data.get('basis', '')]).lower()
+
+    # the previous implementation, which lowercased the fields on every check
+    def search(self, string):
+        return string in self.FullTitle.lower() or string in self.Description.lower()
+
+def create_games(size):
+    with open(os.path.join(root, 'data.json'), 'r') as f:
+        catalog = json.loads(f.read())
+
+    entries = [(author, title, data) for author, titles in catalog['games'].items() for title, data in titles.items()]
+    return [Game(author, title + '-{0}'.format(i), data) for i, (author, title, data) in ((i, entries[i % len(entries)]) for i in range(size))]
+
+def type_terms(terms):
+    typed = []
+    for term in terms:
+        typed += [term[:i] for i in range(1, len(term) + 1)]
+        typed += [term[:i] for i in range(len(term) - 1, 0, -1)]
+    return typed
+
+def measure_scan(games, typed):
+    shown = list(games)
+    excluded = []
+    previous = ''
+
+    start = time.perf_counter()
+    for text in typed:
+        if previous in text:
+            excluded += [game for game in shown if not game.search(text)]
+            shown = [game for game in shown if game.search(text)]
+        else:
+            shown += [game for game in excluded if game.search(text)]
+            excluded = [game for game in excluded if not game.search(text)]
+        previous = text
+    return time.perf_counter() - start
+
+def measure_index(games, typed):
+    index = GameIndex()
+    search = SearchIndex(index)
+
+    start = time.perf_counter()
+    for game in games:
+        index.add(game)
+    search.add(*games)
+    search.build()
+    built = time.perf_counter() - start
+
+    shown = (1 << len(games)) - 1
+    excluded = 0
+    previous = ''
+
+    start = time.perf_counter()
+    for text in typed:
+        if previous in text:
+            excluded |= shown & ~search.search(text, shown)
+            shown &= ~excluded
+        else:
+            included = search.search(text, excluded)
+            excluded &= ~included
+            shown |= included
+        previous = text
+    return built, time.perf_counter() - start
+
+if __name__ == '__main__':
+    sizes = [int(size) for size in sys.argv[1:]] or [1000, 10000]
+    typed = type_terms(['pokered', 'crystal', 'rgbds', 'speedchoice'])
+
+    for size in sizes:
+        games = create_games(size)
+        scan = measure_scan(games, typed)
+        built, indexed = measure_index(games, typed)
+        print('{0:6} games, {1} keystrokes   scan {2:7.2f}ms per keystroke   index {3:7.2f}ms per keystroke (built in {4:.3f}s)'.format(size, len(typed), 1000 * scan / len(typed), 1000 * indexed / len(typed), built))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# Compares the time and memory to initialize the catalog with and without the startup cache
+#
+# python benchmarks/startup.py [builds per repository] [catalog sizes]
+#
+# A temporary games directory is filled with empty builds for each repository of the catalog,
+# and each start runs in its own process, with the temporary directory as its working directory
+# The catalog is repeated with new titles until it has each of the given number of entries
+#
+# A cold start scans and hydrates every repository, and a warm start restores them from the cache
+
+import os, sys, json, time, tempfile, tracemalloc, subprocess
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+def start(cold, trace):
+    # importing the manager initializes it once, so measure a new one
+    from manage import PRET_Manager
+
+    manager = PRET_Manager()
+    manager.CatalogCache.Cold = cold
+
+    if trace:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    manager.init()
+    elapsed = time.perf_counter() - start
+
+    memory = tracemalloc.get_traced_memory()[0] if trace else 0
+    hydrated = len([repo for repo in manager.All if repo.Hydrated])
+
+    print(json.dumps([elapsed, memory, len(manager.All), hydrated]))
+
+def create_directory(builds, size):
+    directory = tempfile.mkdtemp()
+    os.symlink(os.path.join(root, 'assets'), os.path.join(directory, 'assets'))
+
+    with open('data.json', 'r') as f:
+        catalog = json.loads(f.read())
+
+    entries = [(author, title, data) for author, titles in catalog['games'].items() for title, data in titles.items() if author != 'gbdev']
+    games = {}
+
+    for i in range(size):
+        author, title, data = entries[i % len(entries)]
+        if i >= len(entries):
+            title += '-{0}'.format(i // len(entries))
+
+        games.setdefault(author, {})[title] = data
+
+        for j in range(builds):
+            build = '{0}/games/{1}/{2}/builds/master/2024-01-{3:02} {4:08x} (v{3})/'.format(directory, author, title, j % 28 + 1, j)
+            os.makedirs(build)
+            open(build + title + '.gbc', 'w').close()
+
+    catalog['games'] = games
+    with open(directory + '/data.json', 'w') as f:
+        f.write(json.dumps(catalog))
+
+    return directory
+
+def run(directory, cold, trace):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--start', str(int(cold)), str(int(trace))], cwd=directory, capture_output=True, encoding='utf-8').stdout
+    return json.loads(output.strip().split('\n')[-1])
+
+def measure(name, directory, cold):
+    elapsed, _, count, hydrated = run(directory, cold, False)
+    memory = run(directory, cold, True)[1]
+    print('{0:<6} {1:5} entries {2:8.3f}s {3:8.1f} MB   {4} hydrated'.format(name, count, elapsed, memory / 1024 / 1024, hydrated))
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--start':
+        start(sys.argv[2] == '1', sys.argv[3] == '1')
+    else:
+        os.chdir(root)
+        builds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+        sizes = [int(size) for size in sys.argv[2:]] or [100, 5000]
+
+        print('{0} builds per repository'.format(builds))
+
+        for size in sizes:
+            directory = create_directory(builds, size)
+            measure('cold', directory, True)
+            measure('warm', directory, False)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# Reports the CPU time used by pret manager while a long-running child command executes
+#
+# python benchmarks/wait_cpu.py [seconds]
+
+import os, sys, time, subprocess
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+os.chdir(root)
+
+from manage import pret_manager
+from src.Environment import Command
+
+def measure(name, handler):
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    handler()
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    print('{0:<12} wall: {1:6.2f}s   cpu: {2:6.3f}s   ({3:5.1f}% of a core)'.format(name, wall, cpu, 100 * cpu / wall))
+
+# the previous implementation, which polled until the process exited
+def busy_poll(seconds):
+    process = subprocess.Popen(['sleep', str(seconds)])
+    while process.poll() is None:
+        pass
+
+if __name__ == '__main__':
+    seconds = sys.argv[1] if len(sys.argv) > 1 else '3'
+    sleep = Command('sleep', pret_manager.Environments)
+
+    measure('busy-poll', lambda: busy_poll(seconds))
+    measure('wait', lambda: sleep.run(seconds))
+    measure('timeout', lambda: sleep.run(seconds, Timeout=1))
@@ -1,4 +1,4 @@
-import sys
+import sys, queue, threading
 
 '''
 TODO:
@@ -23,10 +23,13 @@ https://nuitka.net/
 '''
 from src.panel import *
 from src.gametile import *
+from src.tileview import *
 from src.gamepanel import *
 from src.base import *
 from src.catalogs import *
 from src.process import *
+from src.Workers import WorkerPool
+from src.FilterEngine import FilterEngine
 
 class GameQueue(HBox):
     def __init__(self, gameGUI):
@@ -62,9 +65,17 @@ class GameGUI(QWidget):
         self.isGit = True
         
         self.isQueued = False
+        self.isActive = False
         
         self.Queue = GameQueue(self)
-        self.Tile = GameTile(self)
+
+        if GUI.Tiles.isVirtual:
+            # the tile is painted by the browser instead of being a widget
+            self.Tile = None
+            GUI.Tiles.Content.watch(game)
+        else:
+            self.Tile = GameTile(self)
+
         self.Panel = None
 
         # TODO - these should also connect to signals
@@ -73,19 +84,25 @@ class GameGUI(QWidget):
     # todo - emitter
     def setQueued(self, queued):
         self.isQueued = queued
-        self.Tile.setProperty('queued', queued)
-        self.Tile.updateStyle()
+        self.updateTile('queued', queued)
 
     # todo - emitter
     def setActive(self, value):
+        self.isActive = value
         self.Queue.setProperty("active",value)
-        self.Tile.setProperty("active",value)
         self.Queue.updateStyle()
-        self.Tile.updateStyle()
+        self.updateTile('active', value)
 
         if not self.Panel:
             self.Panel = GamePanel(self)
 
+    def updateTile(self, key, value):
+        if self.Tile:
+            self.Tile.setProperty(key, value)
+            self.Tile.updateStyle()
+        else:
+            self.GUI.Tiles.Content.changed(self.Game)
+
     def process(self):
         self.GUI.startProcess([self.Game])
 
@@ -184,7 +201,7 @@ class QueueHeader(Grid):
 class Queue(VBox):
     def __init__(self, GUI):
         super().__init__(GUI)
-        self.List = []
+        self.List = OrderedSet()
         self.isEmpty = False
 
         self.Header = QueueHeader(self)
@@ -217,7 +234,7 @@ class Queue(VBox):
 
     def addGame(self, gameGUI):
         if gameGUI not in self.List:
-            self.List.append(gameGUI)
+            self.List.add(gameGUI)
             gameGUI.setQueued(True)
             gameGUI.Queue.addTo(self.ListGUI)
 
@@ -228,7 +245,7 @@ class Queue(VBox):
 
     def removeGame(self, gameGUI):
         if gameGUI in self.List:
-            self.List.pop( self.List.index(gameGUI) )
+            self.List.remove(gameGUI)
             gameGUI.setQueued(False)
             gameGUI.Queue.addTo(None)
 
@@ -306,7 +323,7 @@ class TilesContextMenu(ContextMenu):
         if not tiles.isEmpty and not tiles.GUI.Window.Process:
             self.addMenu( ProcessesMenu(tiles) )
 
-        if [tiles.GUI.Manager.Search.GUI] != tiles.OR_Lists + tiles.AND_Lists + tiles.NOT_Lists:
+        if [tiles.GUI.Manager.Search.GUI] != tiles.Filter.lists():
             self.addAction( ClearBrowser(tiles) )
 
         self.Coords = tiles.Content.Scroll.mapToGlobal(QPoint(0, 0))
@@ -320,6 +337,13 @@ class TileContent(Flow):
         self.Scroll.setObjectName('Tiles')
         self.addTo(parent, 95)
 
+    def apply(self, hide, show, bits):
+        for game in hide:
+            game.GUI.Tile.addTo(None)
+
+        for game in show:
+            game.GUI.Tile.addTo(self)
+
 class TilesHeaderMenuIcon(MenuIcon):
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -349,25 +373,23 @@ class Tiles(VBox):
     def __init__(self, GUI):
         super().__init__(GUI)
         self.Header = TilesHeader(self)
-        self.Content = TileContent(self)
+        # only read at startup, since the games create their tiles for the widget browser
+        self.isVirtual = GUI.Manager.Settings.get('Browser.Mode') == 'virtual'
+        self.Content = TileView(self) if self.isVirtual else TileContent(self)
+        self.Filter = FilterEngine(GUI.Manager.GameIndex)
         self.reset()
         
         self.addTo(GUI.Col2, 2)
 
     def reset(self):
-        self.OR_Lists = []
-        self.OR_Games = []
-        self.AND_Lists = []
-        self.AND_Games = []
-        self.NOT_Lists = []
-        self.NOT_Games = []
-        self.All_Games = []
+        self.Filter.reset()
+        self.Shown = 0
         self.isEmpty = False
         self.updateIsEmpty()
 
     def updateIsEmpty(self):
-        if self.isEmpty == bool(self.All_Games):
-            self.isEmpty = not bool(self.All_Games)
+        if self.isEmpty == bool(self.Filter.Bits):
+            self.isEmpty = not bool(self.Filter.Bits)
 
     def addToFavoritesHandler(self):
         self.GUI.Manager.Catalogs.Flags.get('Favorites').addGames(self.getData())
@@ -387,90 +409,41 @@ class Tiles(VBox):
     def removeFromQueueHandler(self):
         self.GUI.Queue.removeGames(self.getData())
 
-    def erase(self):
-        for game in self.All_Games:
-            game.GUI.Tile.addTo(None)
+    def clear(self):
+        self.Content.apply(self.GUI.Manager.GameIndex.games(self.Shown), [], 0)
 
-        for list in self.OR_Lists + self.AND_Lists + self.NOT_Lists:
+        for list in self.Filter.lists():
             if list != self.GUI.Manager.Search.GUI:
                 list.setMode(None)
 
         self.reset()
-        self.addAND(self.GUI.Manager.Search.GUI, True)
 
-    def is_game_valid(self, game):
-        if self.OR_Lists:
-            if self.AND_Lists:
-                return game in self.OR_Games and game in self.AND_Games and game not in self.NOT_Games
-            else:
-                return game in self.OR_Games and game not in self.NOT_Games
-        elif self.AND_Lists:
-            return game in self.AND_Games and game not in self.NOT_Games
-        else:
-            return False
+    def erase(self):
+        self.clear()
+        self.addAND(self.GUI.Manager.Search.GUI, True)
 
     def compile(self, updateGUI = True):
-        for game in self.All_Games[:]:
-            if not self.is_game_valid(game):
-                self.All_Games.pop(self.All_Games.index(game))
-                if updateGUI: game.GUI.Tile.addTo(None)
-
-        if self.OR_Lists:
-            for game in self.OR_Games:
-                if self.is_game_valid(game):
-                    if game not in self.All_Games:
-                        self.All_Games.append(game)
-                    if updateGUI and game.GUI.Tile.Parent != self.Content: game.GUI.Tile.addTo(self.Content)
-        elif self.AND_Lists:
-            for game in self.AND_Games:
-                if self.is_game_valid(game):
-                    if game not in self.All_Games:
-                        self.All_Games.append(game)
-                    if updateGUI and game.GUI.Tile.Parent != self.Content: game.GUI.Tile.addTo(self.Content)
-
+        self.Filter.compile()
         self.updateIsEmpty()
 
-    def refresh(self):
-        for game in self.GUI.Manager.All:
-            if game not in self.All_Games:
-                if game.GUI.Tile.Parent == self.Content:
-                    game.GUI.Tile.addTo(None)
-            else:
-                if game.GUI.Tile.Parent != self.Content:
-                    game.GUI.Tile.addTo(self.Content)
+        if updateGUI:
+            self.update()
 
+    # only show or hide the tiles which changed since they were last updated
+    def update(self):
+        hide, show = self.Filter.delta(self.Shown)
+        self.Shown = self.Filter.Bits
+        self.Content.apply(hide, show, self.Shown)
+
+    def refresh(self):
+        self.update()
         self.GUI.Manager.App.processEvents()
 
     def saveList(self):
-        self.GUI.saveList(self.All_Games)
+        self.GUI.saveList(self.getData())
 
     def removeList(self, list, type):
-        lists = getattr(self, type + '_Lists')
-        if list not in lists:
-            return
-
-        lists.pop(lists.index(list))
-
-        # Recompile games list
-        games = []
-        setattr(self, type + '_Games', games)
-        
-        if type == 'AND':
-            firstList = True
-            for list in lists:
-                if firstList:
-                    games += list.getData()
-                    firstList = False
-                else:
-                    data = list.getData()
-                    for game in games[:]:
-                        if game not in data:
-                            games.pop(games.index(game))
-        else:
-            for list in lists:
-                for game in list.getData():
-                    if game not in games:
-                        games.append(game)
+        self.Filter.remove(list, type)
 
     def removeNOT(self, list):
         self.removeList(list, 'NOT')
@@ -481,85 +454,37 @@ class Tiles(VBox):
     def removeOR(self, list):
         self.removeList(list, 'OR')
 
-    def removeAND(self, list):
-        self.removeList(list, 'OR')
-
     def remove(self, list, updateGUI=True):
-        self.removeList(list, 'OR')
-        self.removeList(list, 'AND')
-        self.removeList(list, 'NOT')
+        self.Filter.remove(list)
         self.compile(updateGUI)
 
-    def addAND(self, list, updateGUI=True):
-        self.removeOR(list)
-        self.removeNOT(list)
-
-        if list in self.AND_Lists:
-            return
-
-        self.AND_Lists.append(list)
+    def addList(self, list, type, updateGUI):
+        if self.Filter.add(list, type):
+            self.compile(updateGUI)
 
-        data = list.getData()
-        if len(self.AND_Lists) == 1:
-            self.AND_Games += data
-        else:
-            for game in self.AND_Games[:]:
-                if game not in data:
-                    self.AND_Games.pop(self.AND_Games.index(game))
-
-        self.compile(updateGUI)
+    def addAND(self, list, updateGUI=True):
+        self.addList(list, 'AND', updateGUI)
 
     def addNEW(self, list, updateGUI=True):
-        for game in self.All_Games:
-            game.GUI.Tile.addTo(None)
-
-        for other_list in self.OR_Lists + self.AND_Lists + self.NOT_Lists:
-            if other_list != self.GUI.Manager.Search.GUI:
-                other_list.setMode(None)
-
-        self.reset()
+        self.clear()
         self.addOR(list, False)
         self.addAND(self.GUI.Manager.Search.GUI, updateGUI)
 
     def addNOT(self, list, updateGUI=True):
-        self.removeAND(list)
-        self.removeOR(list)
-
-        if list in self.NOT_Lists:
-            return
-
-        self.NOT_Lists.append(list)
-
-        for game in list.getData():
-            if game not in self.NOT_Games:
-                self.NOT_Games.append(game)
-
-        self.compile(updateGUI)
+        self.addList(list, 'NOT', updateGUI)
 
     def addOR(self, list, updateGUI=True):
-        self.removeAND(list)
-        self.removeNOT(list)
-
-        if list in self.OR_Lists:
-            return
-
-        self.OR_Lists.append(list)
-
-        for game in list.getData():
-            if game not in self.OR_Games:
-                self.OR_Games.append(game)
-
-        self.compile(updateGUI)
+        self.addList(list, 'OR', updateGUI)
 
     def getData(self):
-        return self.All_Games[:]
+        return self.Filter.games()
 
     def process(self, event):
-        if self.All_Games:
+        if self.Filter.Bits:
             self.GUI.startProcess(self.getData())
             
     def specificProcess(self, sequence, *args):
-        if self.All_Games:
+        if self.Filter.Bits:
             self.GUI.startSpecificProcess(sequence, self.getData(), *args)
 
 class ManagerThread(QThread):
@@ -567,6 +492,7 @@ class ManagerThread(QThread):
         super().__init__()
         self.GUI = GUI
         self.Window = GUI.Window
+        self.GUI.Manager.Cancelled = False
         self.Window.Processing.emit(True)
         self.finished.connect(self.finish)
         self.start()
@@ -615,9 +541,9 @@ class DownloadGuides(ManagerThread):
 class ExecuteProcess(ManagerThread):
     def __init__(self, GUI, sequence, games, build_options=[]):
         self.Games = games
-        self.Game = None
         self.Sequence = sequence
         self.BuildOptions = build_options
+        self.Pool = WorkerPool(GUI.Manager, GUI.Manager.getJobs())
 
         super().__init__(GUI)
 
@@ -625,15 +551,14 @@ class ExecuteProcess(ManagerThread):
         if not self.Games:
             self.GUI.Manager.print('No games to process')
         elif self.Sequence:
-            for game in self.Games:
-                self.Game = game
-                game.process(self.Sequence, self.BuildOptions)
+            self.GUI.Manager.process(self.Games, self.Sequence, self.BuildOptions, self.Pool)
         else:
             self.GUI.Manager.print('No actions to process')
 
     def finish(self):
-        if self.Game:
-            self.Game.setProcessing(False)
+        # reset any games that were interrupted mid-process
+        for game in self.Pool.getActive():
+            game.setProcessing(False)
 
         super().finish()
 
@@ -709,6 +634,58 @@ class MainContents(HBox):
     def print(self, msg):
         self.Process.Body.addStatusMessage('pret-manager:\t' + msg)
 
+class LogQueue(QObject):
+    def __init__(self, window, size=1000, interval=50):
+        super().__init__()
+        self.Window = window
+        self.Size = size
+        self.Queue = queue.Queue(size)
+        # lines which could not be queued in time, which are output after the queued lines instead of being dropped
+        self.Overflow = []
+        self.Lock = threading.Lock()
+
+        self.Timer = QTimer(self)
+        self.Timer.setInterval(interval)
+        self.Timer.timeout.connect(self.flush)
+        self.Timer.start()
+
+    def put(self, msg):
+        # the gui thread cannot wait on itself, so flush anything pending and emit directly
+        if QThread.currentThread() == self.thread():
+            self.flush()
+            self.Window.Logger.emit(msg)
+        else:
+            # keep the order of the lines once any have overflowed
+            with self.Lock:
+                if self.Overflow:
+                    self.Overflow.append(msg)
+                    return
+
+            # block the producing thread while the gui catches up
+            try:
+                self.Queue.put(msg, timeout=5)
+            except queue.Full:
+                # the gui may be waiting on this thread, so stop blocking but keep the line
+                with self.Lock:
+                    self.Overflow.append(msg)
+
+    def flush(self):
+        lines = []
+        while len(lines) < self.Size:
+            try:
+                lines.append(self.Queue.get_nowait())
+            except queue.Empty:
+                break
+
+        # the overflowed lines are newer than every queued line
+        if len(lines) < self.Size:
+            with self.Lock:
+                lines += self.Overflow
+                self.Overflow = []
+
+        if lines:
+            self.Window.Logger.emit('\n'.join(lines))
+
 class PRET_Manager_GUI(QMainWindow):
     Logger = pyqtSignal(str)
     Processing = pyqtSignal(bool)
@@ -720,6 +697,7 @@ class PRET_Manager_GUI(QMainWindow):
         super().__init__()
         self.Process = None
         self.Manager = manager
+        self.LogQueue = LogQueue(self)
         self.setWindowTitle("pret manager")
         self.setWindowIcon(QIcon('assets/images/icon.png'))
         self.Widget = VBox(self)
@@ -731,6 +709,9 @@ class PRET_Manager_GUI(QMainWindow):
 
         self.TerminateProcess = TerminateProcess(self)
 
+    def log(self, msg):
+        self.LogQueue.put(msg)
+
     def terminateProcess(self):
         if self.Process:
             self.Process.terminate()
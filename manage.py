@@ -1,12 +1,24 @@
 #!/usr/bin/env python
 
-import os, re, argparse, json, signal
+import os, re, argparse, json, signal, threading, time, tarfile, traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import gui
 from src.base import *
 from src.Environment import *
 from src.Files import *
 from src.bps import Patcher
+from src.Workers import WorkerPool
+from src.Refresh import RefreshEngine
+from src.RemoteCache import RemoteCache
+from src.BuildCache import BuildCache
+from src.ObjectStore import ObjectStore
+from src.StateStore import StateStore
+from src.CatalogCache import CatalogCache
+from src.DirectoryIndex import DirectoryIndex
+from src.FileWatcher import FileWatcher
+from src.FilterEngine import GameIndex
+from src.SearchIndex import SearchIndex
 from PyQt5.QtCore import pyqtSignal
 
 build_extensions = ['gb','gbc','pocket','patch']
@@ -14,6 +26,8 @@ patch_extensions = ['ips','bps','bsp']
 release_extensions = build_extensions + patch_extensions + ['zip']
 repo_metadata_properties = ['PrimaryGame','Branches','GitTags','CurrentBranch','RGBDS','Excluding','Favorites']
 rgbds_files = ['rgbasm','rgbfix','rgblink','rgbgfx']
+# the attributes of a repository which are only set once it is hydrated
+hydrated_properties = ['git','github','make','Branches','GitTags','commits','CurrentBranch','RGBDS','PrimaryGame','builds','releases','patches','ReleaseIDs']
 
 def error(msg):
     raise Exception('Error:\t' + msg)
@@ -21,18 +35,17 @@ def error(msg):
 def get_files(path):
     return next(os.walk(path))[2]
 
-def get_releases(path):
-    return [file for file in Path(path).iterdir() if file.suffix[1:] in release_extensions]
-
 def get_builds(path):
     return [file for file in Path(path).iterdir() if file.suffix[1:] in build_extensions]
 
-def get_patches(path):
-    return [file for file in Path(path).iterdir() if file.suffix[1:] in patch_extensions]
-
 def get_rgbds(path):
     return [file for file in Path(path).iterdir() if file.name in rgbds_files]
 
+# split a process sequence into its refresh/update stage and its clean/build stage
+def split_sequence(sequence):
+    network = re.match(r'^r?u?', sequence).group(0)
+    return network, sequence[len(network):]
+
 # remove invalid windows path chars from name
 def legal_name(name):
     return re.sub(r'[<>:"/\|?*]', '', name)
@@ -49,7 +62,8 @@ class CatalogEntry:
         self.Manager = catalog.Manager
         self.Name = name
         self.GameStructure = {}
-        self.GameList = []
+        self.GameList = OrderedSet()
+        self.Bits = 0
         self.GUI = self.build_GUI() if catalog.GUI else None
 
     def build_GUI(self):
@@ -60,15 +74,16 @@ class CatalogEntry:
 
     def reset(self):
         self.GameStructure = {}
-        self.GameList = []
+        self.GameList = OrderedSet()
+        self.Bits = 0
 
     def addGame(self, game):
-        if game not in self.GameList:
-            self.GameList.append(game)
+        self.GameList.add(game)
+        self.Bits |= game.Bit
 
     def removeGame(self, game):
-        if game in self.GameList:
-            self.GameList.pop(self.GameList.index(game))
+        self.GameList.discard(game)
+        self.Bits &= ~game.Bit
 
 class AuthorEntry(CatalogEntry):
     def __init__(self, *args):
@@ -106,61 +121,64 @@ class BaseListEntry(CatalogEntry):
     def addGame(self, game):
         super().addGame(game)
         if game.author not in self.GameStructure:
-            self.GameStructure[game.author] = [game.title]
+            self.GameStructure[game.author] = OrderedSet([game.title])
         else:
-            self.GameStructure[game.author].append(game.title)
+            self.GameStructure[game.author].add(game.title)
 
     def addGames(self, games):
-        self.removeFromFilter()
-
-        isChanged = False
-        for game in games:
-            if game not in self.GameList:
-                isChanged = True
-                self.addGame(game)
-                
-        self.addToFilter()
+        with self.Manager.Lock, self.Manager.StateStore.batch():
+            self.removeFromFilter()
+
+            isChanged = False
+            for game in games:
+                if game not in self.GameList:
+                    isChanged = True
+                    self.addGame(game)
+                    
+            self.addToFilter()
 
-        if isChanged:
-            self.write()
+            if isChanged:
+                self.write()
 
     def removeGame(self, game):
         super().removeGame(game)
-        self.GameStructure[game.author].pop( self.GameStructure[game.author].index(game.title) )
+        self.GameStructure[game.author].discard(game.title)
         if not self.GameStructure[game.author]:
             del self.GameStructure[game.author]
 
     def removeGames(self, games, isPermanent=False):
-        self.removeFromFilter()
-
-        isChanged = False
-        for game in games:
-            if game in self.GameList:
-                isChanged = True
-                self.removeGame(game)
-                
-        if isPermanent:
-            self.GUI.setMode(None)
-            self.Manager.GUI.Content.Tiles.refresh()
-        else:
-            self.addToFilter()
+        with self.Manager.Lock, self.Manager.StateStore.batch():
+            self.removeFromFilter()
+
+            isChanged = False
+            for game in games:
+                if game in self.GameList:
+                    isChanged = True
+                    self.removeGame(game)
+                    
+            if isPermanent:
+                self.GUI.setMode(None)
+                self.Manager.GUI.Content.Tiles.refresh()
+            else:
+                self.addToFilter()
 
-        if isChanged:
-            self.write()
+            if isChanged:
+                self.write()
 
     def toggleGames(self, games):
-        self.removeFromFilter()
+        with self.Manager.Lock, self.Manager.StateStore.batch():
+            self.removeFromFilter()
 
-        for game in games:
-            if game in self.GameList:
-                self.removeGame(game)
-            else:
-                self.addGame(game)
+            for game in games:
+                if game in self.GameList:
+                    self.removeGame(game)
+                else:
+                    self.addGame(game)
 
-        self.addToFilter()
+            self.addToFilter()
 
-        if games:
-            self.write()
+            if games:
+                self.write()
 
     def removeFromFilter(self):
         if self.GUI and self.GUI.Mode:
@@ -192,7 +210,7 @@ class ListEntry(BaseListEntry):
 
     def write(self):
         with open(list_dir + self.Name + '.json', 'w') as f:
-            f.write(json.dumps(self.GameStructure, indent=4))
+            f.write(json.dumps({ author : list(titles) for author, titles in self.GameStructure.items() }, indent=4))
 
     def erase(self):
         self.reset(True)
@@ -206,6 +224,11 @@ class FlagListEntry(BaseListEntry):
         super().addGame(game)
         game.setFlag(self, True)
 
+    # add a game whose flag is already set, without setting it again (which could load the game)
+    def restoreGame(self, game):
+        if game not in self.GameList:
+            super().addGame(game)
+
     def removeGame(self, game):
         super().removeGame(game)
         game.setFlag(self, False)
@@ -216,15 +239,31 @@ class SearchEntry(BaseListEntry):
         self.Queue = []
         self.Active = False
 
-        self.ExcludedGames = []
+        # the games which do not match the search term
+        self.ExcludedBits = 0
         self.addGames(self.Manager.All)
 
         self.PreviousText = ""
 
+        # in the background mode, only the latest text is searched, once typing pauses
+        self.Text = ""
+        self.Searching = False
+        self.Keystrokes = 0
+        self.FirstKeystroke = None
+
     def build_GUI(self):
         return gui.SearchBox(self)
 
     def onTextChanged(self, text):
+        self.Keystrokes += 1
+        if self.FirstKeystroke is None:
+            self.FirstKeystroke = time.perf_counter()
+
+        if self.Manager.Settings.get('Search.Mode') == 'background':
+            self.Text = text
+            self.GUI.Timer.start(self.Manager.Settings.get('Search.Debounce'))
+            return
+
         self.Queue.append(text)
         # if not currently active, then process
         if not self.Active:
@@ -234,44 +273,80 @@ class SearchEntry(BaseListEntry):
         self.Active = len(self.Queue)
         while( self.Active ):
             text = self.Queue[0]
+            start = time.perf_counter()
+            bits = self.evaluate(text, self.PreviousText, self.Bits, self.ExcludedBits)
+            self.apply(text, bits, time.perf_counter() - start)
 
-            text_lower = text.lower()
-
-            # if the search term was added to:
-            if self.PreviousText in text:
-                gamesToExclude = []
-                for game in self.GameList:
-                    if not game.search(text_lower):
-                        gamesToExclude.append(game)
-                        self.ExcludedGames.append(game)
-                self.removeGames(gamesToExclude)
-            # if the search term was reduced:
-            elif text in self.PreviousText:
-                gamesToAdd = []
-                for game in self.ExcludedGames[:]:
-                    if game.search(text_lower):
-                        gamesToAdd.append(game)
-                        self.ExcludedGames.pop(self.ExcludedGames.index(game))
-                self.addGames(gamesToAdd)
-            # text changed completely:
-            else:
-                gamesToToggle = []
-                for game in self.ExcludedGames[:]:
-                    if game.search(text_lower):
-                        gamesToToggle.append(game)
-                        self.ExcludedGames.pop(self.ExcludedGames.index(game))
+            self.Queue.pop(0)
+            self.Active = len(self.Queue)
 
-                for game in self.GameList:
-                    if not game.search(text_lower):
-                        gamesToToggle.append(game)
-                        self.ExcludedGames.append(game)
+    # returns the bits of the games which match the text
+    # only the ints are read, so it can run on another thread while the games are shown
+    def evaluate(self, text, previous, shown, excluded):
+        index = self.Manager.SearchIndex
+        text_lower = text.lower()
+
+        # if the search term was added to, only the shown games need to be checked:
+        if previous in text:
+            return index.search(text_lower, shown)
+        # if the search term was reduced, only the excluded games need to be checked:
+        elif text in previous:
+            return shown | index.search(text_lower, excluded)
+        # text changed completely:
+        else:
+            return index.search(text_lower, shown | excluded)
 
-                self.toggleGames(gamesToToggle)
+    # show only the games of the bits, with a single change to the browser
+    def apply(self, text, bits, elapsed):
+        changed = self.Bits ^ bits
+        self.ExcludedBits = (self.Bits | self.ExcludedBits) & ~bits
+        self.PreviousText = text
 
+        if changed:
+            self.toggleGames(self.Manager.GameIndex.games(changed))
 
-            self.PreviousText = text
-            self.Queue.pop(0)
-            self.Active = len(self.Queue)
+        self.report(text, elapsed)
+
+    def report(self, text, elapsed):
+        if self.FirstKeystroke is not None and self.Manager.Settings.get('Search.ReportLatency'):
+            latency = time.perf_counter() - self.FirstKeystroke
+            self.Manager.print('Search "{0}": {1} keystroke(s), {2:.1f}ms from the first keystroke to paint, {3:.1f}ms searching'.format(text, self.Keystrokes, 1000 * latency, 1000 * elapsed))
+
+        self.Keystrokes = 0
+        self.FirstKeystroke = None
+
+    # called once typing pauses
+    def startSearch(self):
+        # the latest text is searched once the current search is finished
+        if self.Searching:
+            return
+
+        self.Searching = True
+        args = (self.Text, self.PreviousText, self.Bits, self.ExcludedBits)
+        threading.Thread(target=self.search, args=args, daemon=True).start()
+
+    def search(self, text, *args):
+        start = time.perf_counter()
+        bits = None
+
+        try:
+            bits = self.evaluate(text, *args)
+        finally:
+            self.GUI.ResultSignal.emit(text, bits, time.perf_counter() - start)
+
+    def onResult(self, text, bits, elapsed):
+        self.Searching = False
+
+        if bits is None:
+            return
+
+        # if the text changed since the search started, the result is stale
+        if text != self.Text:
+            if not self.GUI.Timer.isActive():
+                self.startSearch()
+            return
+
+        self.apply(text, bits, elapsed)
 
 class Catalog:
     def __init__(self, catalogs, name, entryClass):
@@ -379,7 +454,8 @@ class Settings:
                 target[key] = {}
             
             fullname += '.'
-            self.store_values(target[key], value, isBase, fullname)
+            # an empty dict in the base settings can contain any keys
+            self.store_values(target[key], value, isBase or not target[key], fullname)
         else:
             target[key] = value
 
@@ -409,11 +485,12 @@ class Settings:
 
 class PRET_Manager(MetaData):
     OutdatedSignal = pyqtSignal(bool)
+    RescanSignal = pyqtSignal(object)
     CygwinPathSignal = pyqtSignal(str)
     w64devkitPathSignal = pyqtSignal(str)
 
     def __init__(self):
-        super().__init__(['Outdated','AutoRefresh','AutoUpdate','AutoRestart','AutoProcess','OnlyKeepLatestBuilds'])
+        super().__init__(['Outdated','AutoRefresh','AutoUpdate','AutoRestart','AutoProcess','OnlyKeepLatestBuilds','ShowLogs','SharedObjects'])
         self.Manager = self
         self.GameDirectory = games_dir
         self.DataDirectory = data_dir
@@ -421,7 +498,20 @@ class PRET_Manager(MetaData):
         self.AuxListing = {}
 
         self.All = []
-        self.Process = None
+        self.GameIndex = GameIndex()
+        self.SearchIndex = SearchIndex(self.GameIndex)
+        self.Processes = []
+        self.Cancelled = False
+        self.Jobs = None
+        self.RefreshJobs = None
+        self.NetworkJobs = None
+        self.ForceRefresh = False
+        self.Worktrees = None
+        self.ForceSharedObjects = False
+        self.CloneStats = {}
+        self.AuxFetched = []
+        self.AuxBatch = False
+        self.Lock = threading.RLock()
         self.GUI = None
         self.App = None
         self.Search = None
@@ -429,7 +519,7 @@ class PRET_Manager(MetaData):
 
         self.FlagLists = ["Library", "Favorites", "Excluding", "Outdated", "Missing","Guides"]
 
-        self.Queue = []
+        self.Queue = OrderedSet()
 
         self.path = {
             'repo' : '.',
@@ -437,7 +527,14 @@ class PRET_Manager(MetaData):
         }
 
         self.Settings = Settings(self)
+        # the manager and the other repositories are owned by data/ and data/<title>/, and the games by games/<author>/<title>/
+        self.StateStore = StateStore(self, data_dir + 'state.db', [(data_dir, 1), (games_dir, 2)])
         self.Environments = Environments(self)
+        self.RemoteCache = RemoteCache(self, data_dir + 'remote_cache.json')
+        self.BuildCache = BuildCache(self, data_dir + 'build_cache/')
+        self.ObjectStore = ObjectStore(self, data_dir + 'objects/')
+        self.CatalogCache = CatalogCache(self, data_dir + 'catalog.cache')
+        self.FileWatcher = FileWatcher(self)
 
         # Default Settings
         self.Outdated = False
@@ -446,6 +543,8 @@ class PRET_Manager(MetaData):
         self.AutoUpdate = False
         self.AutoRestart = False
         self.OnlyKeepLatestBuilds = False
+        self.ShowLogs = False
+        self.SharedObjects = False
         self.readMetaData(False)
         self.Initialized = True
         
@@ -457,38 +556,240 @@ class PRET_Manager(MetaData):
         self.Settings.set('Environment.cygwin', path)
         self.CygwinPathSignal.emit( str(path) )
 
+    def get_aux_name(self, game):
+        return game.author + '/' + game.title
+
+    # fetch the aux branches of all of the games in a single fetch, into refs/aux/<author>/<title>
+    # the branches are kept until the batch is cleaned, so each game can extract its files without fetching again
+    def fetch_aux(self, games):
+        # the aux repository has a single object store, so only one job may use it at a time
+        with self.Aux.Lock:
+            names = [self.get_aux_name(game) for game in games]
+            names = [name for i, name in enumerate(names) if name not in self.AuxFetched and name not in names[:i]]
+
+            if not names:
+                return True
+
+            refspecs = ['"+refs/heads/{0}:refs/aux/{0}"'.format(name) for name in names]
+            if self.Aux.git.fetch('origin --depth 1 --no-tags', *refspecs).returncode:
+                return False
+
+            self.AuxFetched += names
+            return True
+
     def get_aux(self, game, type):
-        success = False
-        name = game.author + '/' + game.title
-        self.Aux.git.run("fetch origin {}:{} --depth 1".format(name, name))
-        self.Aux.switch(name, isCommit = False)
-        targetFiles = game.Aux[type]
-        allFiles = [file for file in get_all_files(self.Aux.path["repo"]) if file.name in targetFiles]
-
-        if len(targetFiles) == len(allFiles):
-            copy_files(allFiles, game.path[type])
-            success = True
-
-        self.Aux.switch("master")
-        self.Aux.git.run("branch -D " + name)
-        self.Aux.git.run("reflog expire --expire-unreachable=now --all")
-        self.Aux.git.run("gc --aggressive --prune=all")
+        if not self.fetch_aux([game]):
+            self.print('Failed to fetch aux data for ' + game.name)
 
-        return success
+        with self.Aux.Lock:
+            success = False
+            name = self.get_aux_name(game)
+
+            if name in self.AuxFetched:
+                mkdir(game.path['base'])
+                archive = game.path['base'] + type + '.tar'
+
+                # the files can be anywhere in the branch, so find the paths with their names
+                targetFiles = game.Aux[type]
+                paths = [path for path in self.Aux.git.run('-c core.quotePath=false ls-tree -r --name-only refs/aux/' + name, CaptureOutput=True) if path and os.path.basename(path) in targetFiles]
+
+                # read the files straight from the fetched commit, without switching the working tree
+                if paths and len(paths) == len(targetFiles):
+                    pathspecs = ['":(literal){0}"'.format(path) for path in paths]
+
+                    if not self.Aux.git.run('archive --format=tar -o "{0}" refs/aux/{1} --'.format(self.Aux.git.path(archive), name), *pathspecs).returncode:
+                        self.extract_aux(archive, game.path[type])
+                        success = True
+
+                if os.path.exists(archive):
+                    os.remove(archive)
+
+            if not self.AuxBatch:
+                self.clean_aux()
+
+            return success
+
+    # extract each file directly into the directory, without the directories of the branch
+    def extract_aux(self, archive, directory):
+        # the data filter rejects anything which would be written outside of the directory
+        options = { 'filter' : 'data' } if hasattr(tarfile, 'data_filter') else {}
+
+        with tarfile.open(archive) as tar:
+            for member in tar.getmembers():
+                if member.isfile():
+                    member.name = os.path.basename(member.name)
+                    tar.extract(member, directory, **options)
+
+    # delete the fetched aux branches, and collect their objects once for the whole batch
+    def clean_aux(self):
+        with self.Aux.Lock:
+            if self.AuxFetched:
+                for name in self.AuxFetched:
+                    self.Aux.git.run('update-ref -d refs/aux/' + name)
+
+                self.AuxFetched = []
+                self.Aux.git.run("reflog expire --expire-unreachable=now --all")
+                self.Aux.git.run("gc --prune=now")
 
     def terminateProcess(self):
         self.print('Terminating Process')
-        
-        if self.Process:
+        self.Cancelled = True
+
+        for process in self.Processes[:]:
             sig = signal.SIGINT
-            os.kill(self.Process.pid, sig)
-            self.setProcess(None)
+            try:
+                signal_process(process, sig)
+            except OSError:
+                pass
+            self.removeProcess(process)
+
+    def addProcess(self, process):
+        with self.Lock:
+            self.Processes.append(process)
+
+    def removeProcess(self, process, msg=''):
+        with self.Lock:
+            if process in self.Processes:
+                self.Processes.pop( self.Processes.index(process) )
 
-    def setProcess(self, process, msg=''):
-        self.Process = process
         if msg:
             self.print(msg)
 
+    def getJobs(self):
+        return self.Jobs or self.Settings.get('Processing.Jobs')
+
+    def getNetworkJobs(self):
+        return self.NetworkJobs or self.Settings.get('Processing.NetworkJobs')
+
+    def getRefreshJobs(self):
+        return self.RefreshJobs or self.Settings.get('Processing.RefreshJobs')
+
+    def useSharedObjects(self):
+        return self.ForceSharedObjects or self.SharedObjects
+
+    def add_clone_stats(self, repo, strategy, elapsed, size):
+        repo.print('Cloned ({0}) in {1:.1f}s, using {2}'.format(strategy, elapsed, format_size(size)))
+
+        with self.Lock:
+            if strategy not in self.CloneStats:
+                self.CloneStats[strategy] = [0, 0, 0]
+
+            stats = self.CloneStats[strategy]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] += size
+
+    # print the totals of each clone strategy used since the last report
+    def report_clone_stats(self):
+        with self.Lock:
+            stats, self.CloneStats = self.CloneStats, {}
+
+        for strategy, [count, elapsed, size] in stats.items():
+            self.print('Cloned {0} repositories ({1}) in {2:.1f}s, using {3}'.format(count, strategy, elapsed, format_size(size)))
+
+    def getWorktrees(self):
+        return self.Worktrees if self.Worktrees is not None else self.Settings.get('Processing.Worktrees')
+
+    # Refresh all of the repositories at once, instead of one at a time
+    def refresh_repos(self, repos):
+        repos = [repo for repo in repos if repo.Type != "patch" and not repo.Excluding]
+        limit = self.getRefreshJobs()
+
+        self.print('Refreshing {0} repositories with up to {1} concurrent queries'.format(len(repos), limit))
+
+        for repo in repos:
+            repo.setProcessing(True)
+
+        try:
+            RefreshEngine(self, limit).run(repos, self.apply_refresh)
+        finally:
+            for repo in repos:
+                if repo.Processing:
+                    repo.setProcessing(False)
+
+            self.RemoteCache.save()
+
+    def apply_refresh(self, repo, remote):
+        with repo.coalesceMetaData():
+            repo.refresh(remote)
+        repo.setProcessing(False)
+        # clearing the processing flag resets the sequence, so the refresh is carried over to the next sequence separately
+        repo.BatchRefreshed = True
+
+    def process(self, repos, sequence, build_options, pool=None):
+        self.Cancelled = False
+        pool = pool or WorkerPool(self, self.getJobs())
+
+        # load each repository up front, instead of within the jobs
+        for repo in repos:
+            repo.hydrate()
+
+        # when refreshing multiple repositories, query all of the remotes concurrently first
+        if sequence[0] == 'r' and len(repos) > 1 and self.getRefreshJobs() > 1:
+            self.refresh_repos(repos)
+            sequence = sequence[1:]
+
+            if not sequence:
+                self.clear_batch_refresh(repos)
+                return
+
+        if pool.Jobs > 1:
+            self.print('Processing {0} repositories with {1} jobs'.format(len(repos), pool.Jobs))
+
+        network, build = split_sequence(sequence)
+
+        # fetch the patches of all of the patch repositories at once
+        patches = [repo for repo in repos if repo.Type == "patch" and "patches" in repo.Aux]
+        if 'u' in network and len(patches) > 1:
+            self.AuxBatch = True
+            self.print('Fetching the patches of {0} repositories'.format(len(patches)))
+            self.fetch_aux(patches)
+
+        def network_stage(repo):
+            if repo.start_process():
+                repo.process_network(network)
+                return True
+
+            return False
+
+        def build_stage(repo):
+            repo.process_build(build, build_options)
+
+        # always run, so a repository cancelled between the stages is not left processing with its metadata unsaved
+        def finish_stage(repo):
+            if repo.Processing:
+                repo.finish_process()
+
+        try:
+            # with multiple jobs, repositories move on to building as soon as they are updated
+            # so that network and cpu work overlap across repositories
+            if pool.Jobs > 1 and network and build:
+                self.print('Pipelining {0} network jobs into {1} build jobs'.format(self.getNetworkJobs(), pool.Jobs))
+                pool.pipeline(repos, [(self.getNetworkJobs(), network_stage), (pool.Jobs, build_stage)], finish_stage)
+            else:
+                pool.run(repos, lambda repo: repo.process(sequence, build_options))
+        except KeyboardInterrupt:
+            # children run in their own process groups, so they must be stopped explicitly
+            self.terminateProcess()
+            raise
+        finally:
+            self.clear_batch_refresh(repos)
+            self.RemoteCache.save()
+            self.CatalogCache.save()
+            self.BuildCache.prune(self.Settings.get('Processing.BuildCacheSize'))
+            self.ObjectStore.report()
+            self.report_clone_stats()
+            self.Environments.report()
+
+            if self.AuxBatch:
+                self.AuxBatch = False
+                self.clean_aux()
+
+    # a batched refresh only applies to the sequence it was made for
+    def clear_batch_refresh(self, repos):
+        for repo in repos:
+            repo.BatchRefreshed = False
+
     def setOutdated(self, outdated):
         if self.Outdated != outdated:
             self.Outdated = outdated
@@ -516,10 +817,27 @@ class PRET_Manager(MetaData):
         self.init()
         self.Search = SearchEntry(self)
 
+        # the watcher runs on its own thread, so the rescans are queued to the gui thread
+        self.RescanSignal.connect(self.rescan)
+        self.FileWatcher.start()
+
+    # rescan the changed directories of each repository
+    def rescan(self, pending):
+        for repo, paths in pending.items():
+            # it might have started processing since the rescan was queued
+            if not self.FileWatcher.defer(repo, paths):
+                repo.rescan(paths)
+
+        self.CatalogCache.save()
+
+        # watch any directories which the rescans found
+        self.FileWatcher.check(pending)
+
     def list(self, which):
         obj = {}
 
-        data = self.git.list(which, self.url, Directory = '.')
+        # rows are streamed from the remote as they arrive
+        data = self.RemoteCache.fetch(self, self.url, which, lambda: self.git.list(which, self.url, Directory = '.'))
 
         for row in data:
             # skip empty rows
@@ -575,9 +893,10 @@ class PRET_Manager(MetaData):
         print(msg)
 
         if self.GUI:
-            self.GUI.Logger.emit(msg)
+            self.GUI.log(msg)
 
     def init(self):
+        self.CatalogCache.load()
         self.Catalogs = Catalogs(self)
 
         # Initialize the Flag Lists
@@ -593,6 +912,8 @@ class PRET_Manager(MetaData):
             
             self.addList(file.split('.')[0], list)
 
+        self.CatalogCache.save()
+
     def handle_args(self):
         args = parser.parse_args()
 
@@ -602,12 +923,19 @@ class PRET_Manager(MetaData):
         else:
             environment = 'wsl'
 
+        if args.cold_start:
+            self.CatalogCache.Cold = True
+        del args.cold_start
+
         self.git = Git(self)
         
         # if no args launch the gui
         if not any(vars(args).values()):
             return self.init_GUI()
 
+        if args.export_metadata:
+            self.StateStore.export()
+
         if args.process is None:
             return
         
@@ -645,15 +973,40 @@ class PRET_Manager(MetaData):
 
         if args.build is None:
             args.build = []
+
+        if args.jobs:
+            if args.jobs[0] < 1:
+                error('The number of jobs must be at least 1. Received: ' + str(args.jobs[0]))
+            self.Jobs = args.jobs[0]
+
+        if args.force_refresh:
+            self.ForceRefresh = True
+
+        if args.network_jobs:
+            if args.network_jobs[0] < 1:
+                error('The number of network jobs must be at least 1. Received: ' + str(args.network_jobs[0]))
+            self.NetworkJobs = args.network_jobs[0]
+
+        if args.refresh_jobs:
+            if args.refresh_jobs[0] < 1:
+                error('The number of refresh jobs must be at least 1. Received: ' + str(args.refresh_jobs[0]))
+            self.RefreshJobs = args.refresh_jobs[0]
         
+        if args.shared_objects:
+            self.ForceSharedObjects = True
+
+        if args.worktrees:
+            if args.worktrees[0] < 0:
+                error('The number of worktree jobs cannot be negative. Received: ' + str(args.worktrees[0]))
+            self.Worktrees = args.worktrees[0]
+
         self.run(processes, args.build)
 
     def run(self, sequence, *build_options):
         if not self.Queue:
             self.print('Queue is empty')
         elif sequence:
-            for repo in self.Queue:
-                repo.process(sequence, build_options)
+            self.process(list(self.Queue), sequence, build_options)
         else:
             self.print('No actions to process')
 
@@ -663,8 +1016,7 @@ class PRET_Manager(MetaData):
         if not os.path.exists(filepath):
             error(filepath + ' not found')
 
-        with open(filepath,"r") as f:
-            file = json.loads(f.read() or '{}')
+        file = self.CatalogCache.read_json(filepath)
 
         data = file["data"]
         for name in data:
@@ -679,7 +1031,7 @@ class PRET_Manager(MetaData):
 
                 # TODO - delete whichever branch it was originally on
             
-            self.AuxListing = read_json(listing)
+            self.AuxListing = self.CatalogCache.read_json(listing)
 
         games = file["games"]
 
@@ -703,30 +1055,36 @@ class PRET_Manager(MetaData):
                 for tag in repo.tags:
                     self.add_repo_tag(repo, tag)
 
+        self.SearchIndex.add(*self.All)
+
     def add_repo_tag(self, repo, tag):
         if not self.Catalogs.Tags.has(tag):
             self.Catalogs.Tags.add(tag)
 
+        # the tags are searched too, and their list can be shared with the data of the catalog,
+        # so it is replaced instead of appended to
+        if tag not in repo.tags:
+            repo.tags = repo.tags + [tag]
+            self.SearchIndex.update(repo)
+
         self.Catalogs.Tags.get(tag).addGame(repo)
 
     def add_to_queue(self, repos):
-        for repo in repos:
-            if repo not in self.Queue:
-                self.Queue.append(repo)
+        self.Queue.update(repos)
 
     def remove_from_queue(self, repos):
         for repo in repos:
-            if repo in self.Queue:
-                self.Queue.pop( self.Queue.index(repo) )
+            self.Queue.discard(repo)
     
     def keep_in_queue(self, repos):
+        repos = set(repos)
         self.remove_from_queue([repo for repo in self.Queue if repo not in repos])
 
     def add_all(self):
         self.add_to_queue(self.All)
 
     def clear_queue(self):
-        self.Queue = []
+        self.Queue = OrderedSet()
 
     def add_repos(self, repos):
         for repo in repos:
@@ -769,6 +1127,15 @@ class PRET_Manager(MetaData):
                 self.keep_in_queue(self.Catalogs.Tags.get(tag).GameList)
 
 class repository(MetaData):
+    # modifications to these are tracked, so they are only compared and written when changed
+    Branches = TrackedProperty('Branches')
+    GitTags = TrackedProperty('GitTags')
+
+    # the scanned builds, releases and patches are stored in the startup cache
+    Cacheable = True
+    # and so are these flags, so the flag lists can be filled without hydrating each repository
+    CachedFlags = ['Missing','Outdated','Library','Excluding','Favorites']
+
     GuidesSignal = pyqtSignal(bool)
     MissingSignal = pyqtSignal(bool)
     OutdatedSignal = pyqtSignal(bool)
@@ -786,23 +1153,32 @@ class repository(MetaData):
         self.manager = manager
         self.Manager = manager
 
+        # the metadata, git commands and scanned files are only loaded once the repository is used
+        self.Hydrated = False
+        self.Hydrating = False
+
         self.author = author
         self.title = title
         self.GUI = None
         self.Lists = []
+        self.Lock = threading.RLock()
+        self.Log = None
+        self.Index = None
 
         self.Data = data
-        self.Branches = {}
-        self.GitTags = {}
-        self.commits = {}
-        self.CurrentBranch = None
 
         self.name = self.title + ' (' + self.author + ')'
+
+        # the position of the game in the bitsets of the catalog lists, which other repositories are never shown in
+        if isGame:
+            manager.GameIndex.add(self)
+        else:
+            self.Bit = 0
+
         self.author_url = 'https://github.com/' + author + '/'
         self.url = self.author_url + title
 
         self.rgbds = data["rgbds"] if "rgbds" in data else ""
-        self.RGBDS = None
         
         if isGame and author in manager.AuxListing and title in manager.AuxListing[author]:
             self.Aux = manager.AuxListing[author][title]
@@ -814,6 +1190,9 @@ class repository(MetaData):
         else:
             self.Type = "disassembly"
 
+        # the properties found by scanning the builds, releases and patches
+        self.ScanProperties = ['releases', 'patches', 'builds'] if self.Type == "patch" else ['builds', 'releases', 'commits']
+
         if "tags" in data:
             if isinstance(data["tags"], list):
                 self.tags = data["tags"]
@@ -842,16 +1221,15 @@ class repository(MetaData):
             'repo' : dir + self.title,
             'releases' : dir + 'releases/',
             'builds' : dir + 'builds/',
+            'worktrees' : dir + 'worktrees/',
             'guides' : dir + 'guides/',
             'patches' : dir + 'patches/'
         }
 
+        self.Processing = False
+        self.BatchRefreshed = False
         self.resetSequence()
 
-        self.git = Git(self)
-        self.github = Github(self)
-        self.make = Make(self)
-
         self.Boxart = 'assets/artwork/{0}.png'.format(self.name)
         if not os.path.exists(self.Boxart):
             self.Boxart = 'assets/images/gb.png'
@@ -862,8 +1240,6 @@ class repository(MetaData):
         if self.hasGuides:
             self.Manager.Catalogs.Flags.get('Guides').addGames([self])
 
-        self.PrimaryGame = None
-
         self.Missing = None
         self.Outdated = None
         self.Excluding = False
@@ -876,19 +1252,78 @@ class repository(MetaData):
         else:
             self.setMissing(not os.path.exists(self.path['repo']))
 
+        # if the repository has not changed since it was last hydrated, its flags are read from the startup cache instead
+        flags = self.Manager.CatalogCache.get_flags(self) if isGame else None
+
+        if flags:
+            self.restore_flags(flags)
+        else:
+            self.hydrate()
+
+        if self.manager.GUI and isGame:
+            self.init_GUI()
+
+    # only called for attributes which have not been set, so the repository is hydrated when one of its hydrated attributes is first used
+    def __getattr__(self, name):
+        if name in hydrated_properties and 'Hydrated' in self.__dict__:
+            self.hydrate()
+            return object.__getattribute__(self, name)
+
+        raise AttributeError("'{0}' object has no attribute '{1}'".format(type(self).__name__, name))
+
+    # assigning a hydrated attribute first loads the others, so the assigned value is not reset once they are loaded
+    def __setattr__(self, name, value):
+        if name in hydrated_properties and not self.__dict__.get('Hydrated', True):
+            self.hydrate()
+
+        super().__setattr__(name, value)
+
+    def restore_flags(self, flags):
+        for name in self.CachedFlags:
+            # the list only gains the game, since the setters of some flags would hydrate it
+            setattr(self, name, flags[name])
+
+            if flags[name]:
+                self.Manager.Catalogs.Flags.get(name).restoreGame(self)
+
+    # load the metadata, branches and files of the repository
+    def hydrate(self):
+        with self.Manager.Lock:
+            if self.Hydrated or self.Hydrating:
+                return
+
+            self.Hydrating = True
+
+            try:
+                self.load_hydrated()
+            finally:
+                self.Hydrating = False
+
+            self.Hydrated = True
+
+    def load_hydrated(self):
+        self.git = Git(self)
+        self.github = Github(self)
+        self.make = Make(self)
+
+        self.Branches = {}
+        self.GitTags = {}
+        self.commits = {}
+        self.CurrentBranch = None
+        self.RGBDS = None
+        self.PrimaryGame = None
+
         self.setOutdated(self.Missing)
 
         self.readMetaData()
 
-        if self.Type == "patch":
-            self.releases = {}
-            self.patches = {}
-            self.parse_patches()
-            self.parse_patch_builds()
-        else:
+        if self.Type != "patch":
             self.parse_branches()
-            self.parse_builds()
-            self.parse_releases()
+
+        # only scan the builds, releases and patches if they changed since the last start
+        if not self.Manager.CatalogCache.restore(self):
+            self.scan()
+            self.Manager.CatalogCache.store(self)
 
         self.setLibrary(bool(self.releases or self.builds or self.commits))
 
@@ -916,79 +1351,112 @@ class repository(MetaData):
         if modified_metadata:
             self.updateMetaData()
 
-        if self.manager.GUI and isGame:
-            self.init_GUI()
+        self.Manager.CatalogCache.store_flags(self)
 
 
 ######### GUI Methods
     def init_GUI(self):
         self.GUI = gui.GameGUI(self.manager.GUI.Content, self)
 
+    # the lowercase text which the search matches against, with each field on its own line
+    def get_search_text(self):
+        return '\n'.join([self.FullTitle, self.Description, self.author, *self.tags, self.Data.get('basis', '')]).lower()
+
     def search(self, string):
-        return string in self.FullTitle.lower() or string in self.Description.lower()
+        return string in self.get_search_text()
 
 ######### Processing Methods
     def setProcessing(self, processing):
-        if self.Processing and not processing:
+        isFinished = self.Processing and not processing
+        if isFinished:
             self.updateMetaData()
 
         self.Processing = processing
         self.ProcessingSignal.emit(processing)
         self.resetSequence()
 
+        # rescan any changes which were made while processing
+        if isFinished:
+            self.Manager.FileWatcher.finished(self)
+
     def resetSequence(self):
         self.Refreshed = False
         self.Cleaned = False
         self.Updated = False
-        self.Processing = False
 
     def process(self, sequence, build_options):
+        network, sequence = split_sequence(sequence)
+
+        if self.start_process():
+            self.process_network(network)
+            self.process_build(sequence, build_options)
+            self.finish_process()
+
+    def start_process(self):
         if self.Excluding:
             self.print('Excluding ' + self.name)
-            return
+            return False
         
         self.print('Processing Starting')
         self.setProcessing(True)
 
+        # the remotes were already queried along with the other repositories
+        if self.BatchRefreshed:
+            self.Refreshed = True
+            self.BatchRefreshed = False
+
+        return True
+
+    # the refresh and update stage
+    # the metadata is written at most once for each step
+    def process_network(self, sequence):
         if len(sequence) and sequence[0] == 'r':
-            self.refresh()
+            with self.coalesceMetaData():
+                self.refresh()
             sequence = sequence[1:]
 
         if len(sequence) and sequence[0] == 'u':
-            self.update()
+            with self.coalesceMetaData():
+                self.update()
             sequence = sequence[1:]
 
-        if self.Type == "patch":
-            if len(sequence) and sequence[0] == 'b':
-                self.build()
-                sequence = sequence[1:]
-
-        elif len(sequence) and ('b' in sequence or 'c' in sequence):
-            if not self.validate_repo():
-                self.print('Cannot run \'make\' on missing repository')
-            # if no specific build options, then build for all branches
-            elif not build_options:
-                starting_branch = self.CurrentBranch
-
-                if self.check_branch_tracking(starting_branch):
-                    self.process_make(sequence)
-
-                for branch in self.Branches:
-                    if branch != starting_branch and self.check_branch_tracking(branch):
-                        if self.switch(branch):
-                            self.process_make(sequence)
-
-                if self.CurrentBranch != starting_branch:
-                    self.switch(starting_branch)
+    # the clean and build stage
+    def process_build(self, sequence, build_options):
+        with self.coalesceMetaData():
+            if self.Type == "patch":
+                if len(sequence) and sequence[0] == 'b':
+                    self.build()
+                    sequence = sequence[1:]
+
+            elif len(sequence) and ('b' in sequence or 'c' in sequence):
+                if not self.validate_repo():
+                    self.print('Cannot run \'make\' on missing repository')
+                # if no specific build options, then build for all branches
+                elif not build_options and self.Manager.getWorktrees():
+                    self.process_worktrees(sequence)
+                elif not build_options:
+                    starting_branch = self.CurrentBranch
+
+                    if self.check_branch_tracking(starting_branch):
+                        self.process_make(sequence)
+
+                    for branch in self.Branches:
+                        if branch != starting_branch and self.check_branch_tracking(branch):
+                            if self.switch(branch):
+                                self.process_make(sequence)
+
+                    if self.CurrentBranch != starting_branch:
+                        self.switch(starting_branch)
                 
-                self.get_current_branch_info()
-            else:
-                if self.switch(*build_options):
-                    self.process_make(sequence)
-                    self.print('Switching back to previous branch/commit')
-                    self.git.switch('-')
                     self.get_current_branch_info()
+                else:
+                    if self.switch(*build_options):
+                        self.process_make(sequence)
+                        self.print('Switching back to previous branch/commit')
+                        self.git.switch('-')
+                        self.get_current_branch_info()
 
+    def finish_process(self):
         self.updateMetaData()
         self.print('Processing Finished')
         self.setProcessing(False)
@@ -1001,6 +1469,36 @@ class repository(MetaData):
             elif process == 'c':
                 self.clean()
 
+    # build each of the tracked branches in its own worktree, so the branches can be built at once without switching
+    def process_worktrees(self, sequence):
+        worktrees = []
+
+        # the worktrees share the repository metadata, so prepare them one at a time
+        for branch in self.Branches:
+            if branch != self.CurrentBranch and self.check_branch_tracking(branch):
+                worktree = Worktree(self, branch)
+                if worktree.prepare():
+                    worktrees.append(worktree)
+
+        builds = {}
+        with ThreadPoolExecutor(max_workers=self.Manager.getWorktrees(), thread_name_prefix='pret_manager') as executor:
+            if self.check_branch_tracking(self.CurrentBranch):
+                builds[executor.submit(self.process_make, sequence)] = self.CurrentBranch
+
+            for worktree in worktrees:
+                builds[executor.submit(worktree.process_make, sequence)] = worktree.CurrentBranch
+
+        # every branch is built regardless, then the repository fails if any of them did
+        failed = []
+        for future, branch in builds.items():
+            exception = future.exception()
+            if exception:
+                self.print('Building branch {0} failed:\n{1}'.format(branch, ''.join(traceback.format_exception(type(exception), exception, exception.__traceback__))))
+                failed.append(branch)
+
+        if failed:
+            raise Exception('Failed to build branches: ' + ', '.join(failed))
+
 
 ######### IO Methods
     def rmdir(self, paths, msg=''):
@@ -1013,14 +1511,53 @@ class repository(MetaData):
             for path in paths:
                 self.print('Removing directory: ' + path)
                 rmdir(path)
+
+                if self.Index:
+                    self.Index.remove(path)
+
+    # the index of a directory of the repository, or None if it does not exist
+    # each directory is read at most once, and kept up to date as files are placed and removed
+    def get_index(self, path):
+        if not self.Index:
+            self.Index = DirectoryIndex(self.path['base'])
+
+        return self.Index.find(path)
+
+    # record files placed into the directory, or read the directory again if they are not known
+    def update_index(self, path, names=None):
+        if self.Index:
+            if names is None:
+                self.Index.invalidate(path)
+            else:
+                self.Index.add(path, names)
+
+    def get_dirs(self, path):
+        index = self.get_index(path)
+        return index.dirs() if index else []
+
+    def get_items(self, path):
+        index = self.get_index(path)
+        return index.items() if index else []
+
+    def get_files(self, path, extensions=None):
+        index = self.get_index(path)
+        return index.files(extensions) if index else []
         
     def print(self, msg):
         if msg:
             msg = self.name + ":\t" + str(msg)
-            print(msg)
 
-            if self.Manager.GUI:
-                self.Manager.GUI.Logger.emit(msg)
+            # when processed alongside other repositories, the log keeps each repository's lines together
+            if self.Log:
+                self.Log.write(self, msg)
+            else:
+                self.output(msg)
+
+    def output(self, msg):
+        print(msg)
+
+        if self.Manager.GUI:
+            self.Manager.GUI.log(msg)
 
 ######### Catalog Methods
 
@@ -1066,13 +1603,16 @@ class repository(MetaData):
     def get_commit(self):
         return self.git.head()
 
-    def list(self, which):
+    # rows can be supplied if the remote was already queried
+    def list(self, which, data=None):
         obj = {}
 
-        if not os.path.exists(self.path["repo"]):
-            data = self.git.list(which, self.url, Directory = '.')
+        if data is not None:
+            pass
+        elif not os.path.exists(self.path["repo"]):
+            data = self.Manager.RemoteCache.fetch(self, self.url, which, lambda: self.git.list(which, self.url, Directory = '.'))
         else:
-            data = self.git.list(which)
+            data = self.Manager.RemoteCache.fetch(self, self.url, which, lambda: self.git.list(which))
 
         for row in data:
             # skip empty rows
@@ -1109,35 +1649,96 @@ class repository(MetaData):
     def parse_builds(self):
         self.builds = {}
 
-        for branchName in get_dirs(self.path['builds']):
-            branch_dir = self.path['builds'] + branchName
-            
-            for dirName in get_dirs(branch_dir):
+        for branchName, branch in self.get_items(self.path['builds']):
+            for dirName, build in branch.items():
                 # if the dir name matches the template, then it is a build
                 if re.match(r'^\d{4}-\d{2}-\d{2} [a-fA-F\d]{8} \([^)]+\)$',dirName):
-                    build_dir = branch_dir + '/' + dirName
-                    files = get_builds(build_dir)
+                    files = build.files(build_extensions)
                     # if builds exist in the directory:
                     if files:
                         self.store_build(branchName, dirName, files)
 
+    def scan(self):
+        # read the directories again
+        self.Index = None
+        self.parse_files()
+
+    def parse_files(self):
+        if self.Type == "patch":
+            self.releases = {}
+            self.patches = {}
+            self.parse_patches()
+            self.parse_patch_builds()
+        else:
+            self.commits = {}
+            self.parse_builds()
+            self.parse_releases()
+
+    # update the scanned files after some of the directories were changed outside of the manager
+    # only the changed directories are read again, or all of them if a path is None
+    def rescan(self, paths):
+        with self.Manager.Lock:
+            if self.Processing:
+                return
+
+            # the directories no longer match the startup cache, so hydrating scans them
+            if not self.Hydrated:
+                self.hydrate()
+                return
+
+            previous = { name : getattr(self, name) for name in self.ScanProperties }
+
+            for path in paths:
+                if path is None:
+                    self.Index = None
+                    break
+
+                self.update_index(path)
+
+            self.parse_files()
+
+            changed = [name for name in self.ScanProperties if getattr(self, name) != previous[name]]
+            if not changed:
+                return
+
+            self.print('Found changes to the ' + ', '.join(changed))
+            self.Manager.CatalogCache.store(self)
+            self.setLibrary(bool(self.releases or self.builds or self.commits))
+
+            if self.PrimaryGame and not os.path.exists(self.PrimaryGame):
+                self.PrimaryGame = None
+                self.updateMetaData()
+
+            self.Manager.CatalogCache.store_flags(self)
+
+            if 'builds' in changed:
+                self.BuildSignal.emit()
+
+            if 'releases' in changed or 'commits' in changed or 'patches' in changed:
+                self.ReleaseSignal.emit()
+
+    # the directories to watch for changes, which are the base directory and every directory which was scanned
+    def get_watched_paths(self):
+        if self.Index:
+            return self.Index.loaded()
+
+        return [self.path['base'], *self.Manager.CatalogCache.get_paths(self)]
+
     def parse_patch_builds(self):
         self.builds = {}
 
-        if os.path.exists(self.path["builds"]):
-            builds = get_builds(self.path["builds"])
-            # if builds exist in the directory:
-            if builds:
-                for build in builds:
-                    self.builds[build.name] = build
+        builds = self.get_files(self.path["builds"], build_extensions)
+        # if builds exist in the directory:
+        if builds:
+            for build in builds:
+                self.builds[build.name] = build
 
     def parse_patches(self):
-        if os.path.exists(self.path["patches"]):
-            patches = get_patches(self.path["patches"])
-            # if patche exist in the directory:
-            if patches:
-                for patch in patches:
-                    self.patches[patch.name] = patch
+        patches = self.get_files(self.path["patches"], patch_extensions)
+        # if patche exist in the directory:
+        if patches:
+            for patch in patches:
+                self.patches[patch.name] = patch
 
     def store_build(self, branchName, dirName, files):
         data = self.get_build_data(branchName, dirName)
@@ -1148,17 +1749,18 @@ class repository(MetaData):
         self.setLibrary(True)
 
     def clean_builds(self):
-        if os.path.exists(self.path['builds']):
-            for branchName in get_dirs(self.path['builds']):
+        builds = self.get_index(self.path['builds'])
+        if builds:
+            for branchName, branch in builds.items():
                 branch_dir = self.path['builds'] + branchName
-                for dirname in get_dirs(branch_dir):
+                for dirname, build in branch.items():
                     build_dir = branch_dir + '/' + dirname
                     error_message = ''
 
                     # if the dir name matches the template, then it is a build
                     if re.match(r'^\d{4}-\d{2}-\d{2} [a-fA-F\d]{8} \([^)]+\)$',dirname):
                         # if no builds exist in the directory:
-                        if not get_builds(build_dir):
+                        if not build.files(build_extensions):
                             error_message = 'Missing valid build files in pre-existing directory: ' + branchName + '/' + dirname
                     else:
                         error_message = 'Invalid build directory name: ' + dirname
@@ -1167,11 +1769,11 @@ class repository(MetaData):
                         self.rmdir(build_dir, error_message)
 
                 # if the branch directory is empty, then delete
-                if not get_dirs(branch_dir):
+                if not branch.dirs():
                     self.rmdir(branch_dir, 'Branch directory has no builds: ' + branchName)
             
             # if the builds directory is empty, then delete
-            if not get_dirs(self.path['builds']):
+            if not builds.dirs():
                 self.rmdir(self.path['builds'], 'Build directory is empty')
 
     def set_branch(self, branch):
@@ -1190,6 +1792,9 @@ class repository(MetaData):
             self.updateMetaData()
 
     def update_branches(self):
+        if self.Manager.Settings.get('Processing.UpdateMode') == 'fetch':
+            return self.fetch_branches()
+
         starting_branch = self.CurrentBranch
 
         updateSuccess = True
@@ -1221,6 +1826,92 @@ class repository(MetaData):
 
         return updateSuccess
 
+    # fetch all of the outdated branches at once, and fast-forward them without switching the working tree
+    def fetch_branches(self):
+        branches = [branch for branch in self.Branches if self.check_branch_outdated(branch)]
+
+        if not branches:
+            return True
+
+        self.print('Fetching ' + ', '.join(branches))
+        refspecs = ['"+refs/heads/{0}:refs/remotes/origin/{0}"'.format(branch) for branch in branches]
+
+        if self.git.fetch('origin', *refspecs).returncode:
+            self.print('Failed to fetch branches')
+            return False
+
+        updateSuccess = True
+        isChanged = False
+        diverged = []
+        current_branch = self.git.current_branch()
+
+        for branch in branches:
+            local = self.git.resolve('refs/heads/' + branch)
+            remote = self.git.resolve('refs/remotes/origin/' + branch)
+
+            # nothing to update if the local branch already contains the remote branch
+            if local == remote or (local and remote and not self.git.run('merge-base --is-ancestor', remote, local).returncode):
+                continue
+
+            # only the checked out branch needs to update the working tree
+            if branch == current_branch:
+                success = not self.git.run('merge --ff-only', 'refs/remotes/origin/' + branch).returncode
+            elif not local:
+                success = not self.git.run('branch --track', branch, 'origin/' + branch).returncode
+            elif not self.git.run('merge-base --is-ancestor', local, remote).returncode:
+                success = not self.git.run('update-ref', 'refs/heads/' + branch, remote, local).returncode
+            else:
+                success = False
+
+            if success:
+                self.print('Updated ' + branch)
+                isChanged = True
+            else:
+                diverged.append(branch)
+
+        # a branch which cannot be fast-forwarded is switched to and pulled instead, like the pull update mode
+        for branch in diverged:
+            self.print(branch + ' cannot be fast-forwarded, pulling instead')
+
+            local = self.git.resolve('refs/heads/' + branch)
+
+            if (branch == self.git.current_branch() or self.switch(branch)) and self.pull():
+                self.print('Updated ' + branch)
+                isChanged = isChanged or local != self.git.resolve('refs/heads/' + branch)
+            else:
+                self.print('Failed to update ' + branch)
+                updateSuccess = False
+
+        if diverged and self.git.current_branch() != current_branch:
+            self.switch(current_branch)
+
+        # the stored commits can also be behind refs which were already updated
+        if self.get_branch_commits(branches):
+            isChanged = True
+
+        if isChanged:
+            self.get_current_branch_info()
+            self.BranchSignal.emit()
+
+        return updateSuccess
+
+    # store the latest commit of each branch from its local ref, and return if any changed
+    def get_branch_commits(self, branches):
+        isChanged = False
+
+        for branch in branches:
+            commit = self.git.resolve('refs/heads/' + branch)
+
+            if commit:
+                data = self.get_branch_data(branch)
+
+                if data.get("LastCommit") != commit:
+                    data["LastCommit"] = commit
+                    data["LastUpdate"] = self.git.date(commit)
+                    isChanged = True
+
+        return isChanged
+
     def switch(self, *args, isCommit=None):
         if isCommit is None:
             isCommit = len(args) == 1 and args[0] not in self.Branches
@@ -1235,6 +1926,10 @@ class repository(MetaData):
 
         result = self.git.switch(*cmds)
 
+        # a shallow repository might not contain the target yet
+        if result.returncode and self.deepen():
+            result = self.git.switch(*cmds)
+
         if result.returncode:
             self.print('Failed to switch to ' + ' '.join(args))
         else:
@@ -1244,16 +1939,21 @@ class repository(MetaData):
         return not result.returncode
     
     def get_current_branch_info(self):
-        # todo - move to Git class
-        branch = self.git.run('rev-parse --abbrev-ref HEAD', CaptureOutput=True)[0]
+        branch = self.git.current_branch()
 
         lastUpdate = self.get_date()
         lastCommit = self.get_commit()
 
         if branch == 'HEAD':
             # Get the corresponding GitTag data
-            data = [self.GitTags[tag] for tag in self.GitTags if self.GitTags[tag]['commit'] == lastCommit][0]
-            data['date'] = lastUpdate
+            data = self.get_commit_tag_data(lastCommit)
+
+            # a shallow repository might not contain the tags of the commit yet
+            if not data and self.deepen():
+                data = self.get_commit_tag_data(lastCommit)
+
+            if data:
+                data['date'] = lastUpdate
         elif branch:
             if branch not in self.Branches:
                 self.Branches[branch] = {}
@@ -1264,14 +1964,27 @@ class repository(MetaData):
 
         self.CurrentBranch = branch
 
+    # the data of the first tag of the commit, from the known tags or otherwise the local tags which point at HEAD
+    def get_commit_tag_data(self, commit):
+        data = [self.GitTags[tag] for tag in self.GitTags if self.GitTags[tag].get('commit') == commit]
+        if data:
+            return data[0]
+
+        for tag in self.git.points_at(commit):
+            data = self.get_tag_data(tag)
+            data['commit'] = commit
+            return data
+
 ######### Refresh Methods
 
-    def refresh(self):
+    # remote can contain the pre-fetched 'head', 'tags' and 'releases' listings
+    def refresh(self, remote=None):
         if self.Type != "patch" and not self.Refreshed:
             self.print("Refreshing repository")
-            branchesOutdated = self.refresh_branches()
-            self.refresh_tags()
-            releasesOutdated = self.refresh_releases()
+            remote = remote or {}
+            branchesOutdated = self.refresh_branches(remote.get('head'))
+            self.refresh_tags(remote.get('tags'))
+            releasesOutdated = self.refresh_releases(remote.get('releases'))
 
             self.clean_directory()
 
@@ -1292,10 +2005,10 @@ class repository(MetaData):
 
         return self.Branches[branch]
 
-    def refresh_branches(self):
+    def refresh_branches(self, data=None):
         newBranch = False
         isOutdated = False
-        for branch, commit in self.list('head'):
+        for branch, commit in self.list('head', data):
             data = self.get_branch_data(branch)
 
             if not data:
@@ -1350,14 +2063,16 @@ class repository(MetaData):
 
         return self.GitTags[tag]
     
-    def refresh_tags(self):
-        for tag, commit in self.list('tags'):
+    def refresh_tags(self, data=None):
+        for tag, commit in self.list('tags', data):
             if tag not in self.GitTags:
                 data = self.get_tag_data(tag)
                 data["commit"] = commit
   
-    def refresh_releases(self):
-        releases = self.github.list()
+    def refresh_releases(self, releases=None):
+        if releases is None:
+            releases = self.Manager.RemoteCache.fetch(self, self.url, 'releases', self.github.list)
+
         isOutdated = False
         for release in releases:
             # ignore empty lines
@@ -1381,7 +2096,7 @@ class repository(MetaData):
                 release_name = data["release"]
                 release_dir = self.path['releases'] + release_name
 
-                if os.path.exists(release_dir):
+                if self.get_index(release_dir):
                     files = self.check_releases(release_dir)
                     if files:
                         self.store_release(tag, files)
@@ -1391,8 +2106,8 @@ class repository(MetaData):
                 release_dir = self.path['releases'] + release_name
 
             if release_dir:
-                for dirName in get_dirs(release_dir):
-                    files = get_builds(release_dir + '/' + dirName)
+                for dirName in self.get_dirs(release_dir):
+                    files = self.get_files(release_dir + '/' + dirName, build_extensions)
                     if files:
                         if data["commit"] not in self.commits:
                             self.commits[data["commit"]] = {}
@@ -1410,11 +2125,11 @@ class repository(MetaData):
             self.releases[release_name][file.name] = file
         
     def check_releases(self, dir):
-        return get_releases(dir)
+        return self.get_files(dir, release_extensions)
      
     def clean_releases(self):
-        if os.path.exists(self.path['releases']):
-            for dirname in get_dirs(self.path['releases']):
+        if self.get_index(self.path['releases']):
+            for dirname in self.get_dirs(self.path['releases']):
                 release_dir = self.path['releases'] + dirname
                 error_message = ''
 
@@ -1426,7 +2141,7 @@ class repository(MetaData):
                     if tag not in self.GitTags:
                         error_message = 'Tag does not exist: ' + tag
                     else:
-                        build_dirs = get_dirs(release_dir)
+                        build_dirs = self.get_dirs(release_dir)
                         if build_dirs:
                             for build_dir_name in build_dirs:
                                 build_dir = release_dir + '/' + build_dir_name
@@ -1435,7 +2150,7 @@ class repository(MetaData):
                                 # if the dir name matches the template, then it is a build
                                 if re.match(r'^\d{4}-\d{2}-\d{2} [a-fA-F\d]{8} \([^)]+\)$', build_dir_name):
                                     # if no builds exist in the directory:
-                                    if not get_builds(build_dir):
+                                    if not self.get_files(build_dir, build_extensions):
                                         build_error_message = 'Missing valid build files in pre-existing directory: ' + build_dir
                                 else:
                                     build_error_message = 'Invalid build directory name: ' + build_dir_name
@@ -1443,7 +2158,7 @@ class repository(MetaData):
                                 if build_error_message:
                                     self.rmdir(build_dir, build_error_message)
 
-                        if not self.check_releases(release_dir) and not get_dirs(release_dir):
+                        if not self.check_releases(release_dir) and not self.get_dirs(release_dir):
                             error_message = 'Missing release files for tag: ' + tag
                 else:
                     error_message = 'Invalid release directory name: ' + dirname
@@ -1452,7 +2167,7 @@ class repository(MetaData):
                     self.rmdir(release_dir, error_message)
 
             # if the releases directory is empty, then delete
-            if not get_dirs(self.path['releases']):
+            if not self.get_dirs(self.path['releases']):
                 self.rmdir(self.path['releases'], 'Release directory is empty')
 
     def get_releases(self, release_id=None):
@@ -1473,6 +2188,8 @@ class repository(MetaData):
                     if msg:
                         self.print(msg)
                     else:
+                        # only the downloaded directory needs to be read
+                        self.update_index(release_dir)
                         files = self.check_releases(release_dir)
                         if files:
                             self.store_release(tag, files)
@@ -1501,9 +2218,10 @@ class repository(MetaData):
     def findNewestGame(self):
         if self.Type == "patch":
             if self.builds:
-                builds = get_builds(self.path["builds"])
+                index = self.get_index(self.path["builds"])
+                builds = index.files(build_extensions) if index else []
                 if builds:
-                    latest = max(builds, key=os.path.getctime)
+                    latest = max(builds, key=lambda file: index.stat(file).st_ctime)
                     return str(latest)
             
             return None
@@ -1533,9 +2251,11 @@ class repository(MetaData):
         elif newest_release:
             newest_dir = self.path['releases'] + newest_release
         
-        if newest_dir:
-            files = get_releases(newest_dir)
-            files.sort(key=os.path.getmtime)
+        index = self.get_index(newest_dir) if newest_dir else None
+
+        if index:
+            files = index.files(release_extensions)
+            files.sort(key=lambda file: index.stat(file).st_mtime)
             return str(files[-1])
         else:
             return None
@@ -1590,6 +2310,9 @@ class repository(MetaData):
             self.MissingSignal.emit(self.Missing)
 
     def setExcluding(self, excluding, addToList=True):
+        # the metadata needs to be loaded before it can be modified
+        self.hydrate()
+
         if self.Excluding != excluding:
             self.Excluding = excluding
 
@@ -1604,6 +2327,8 @@ class repository(MetaData):
             self.updateMetaData()
 
     def setFavorites(self, favorite, addToList=True):
+        self.hydrate()
+
         if self.Favorites != favorite:
             self.Favorites = favorite
 
@@ -1772,8 +2497,25 @@ class repository(MetaData):
         self.print("Initializing repository")
         if single_branch:
             result = self.git.clone("--single-branch --branch {} --depth 1".format(single_branch))
+        elif self.Manager.useSharedObjects():
+            # forks are cloned against the shared object store, which already holds their history, so the clone strategy does not apply
+            if self.get_clone_strategy()[0] != 'full':
+                self.print('Ignoring the clone strategy, since the shared object store is used')
+
+            result = self.Manager.ObjectStore.clone(self)
         else:
-            result = self.git.clone()
+            strategy, depth = self.get_clone_strategy()
+            start = time.time()
+
+            if strategy == 'blobless':
+                result = self.git.clone('--filter=blob:none')
+            elif strategy == 'shallow':
+                result = self.git.clone('--depth {0} --no-single-branch'.format(depth))
+            else:
+                result = self.git.clone()
+
+            if not result.returncode:
+                self.Manager.add_clone_stats(self, strategy, time.time() - start, get_size(self.path['repo'] + '/.git'))
 
         if result.returncode:
             self.print('Could not clone repository')
@@ -1785,6 +2527,32 @@ class repository(MetaData):
             self.setMissing(False)
             return True
 
+    # returns the clone strategy and shallow depth from the repository data, the first of its tags with a strategy, or the default
+    # strategies are 'full', 'blobless' or 'shallow', and a depth can be given as 'shallow:<depth>'
+    def get_clone_strategy(self):
+        strategy = self.Data.get('clone')
+
+        if not strategy:
+            tags = self.Manager.Settings.get('Clone.Tags')
+            strategy = next((tags[tag] for tag in self.tags if tag in tags), None)
+
+        strategy = (strategy or self.Manager.Settings.get('Clone.Strategy')).split(':')
+        depth = int(strategy[1]) if len(strategy) > 1 else self.Manager.Settings.get('Clone.Depth')
+
+        if strategy[0] not in ['full', 'blobless', 'shallow']:
+            self.print('Invalid clone strategy: ' + strategy[0])
+            return 'full', depth
+
+        return strategy[0], depth
+
+    # fetch the full history of a shallow repository, i.e. when switching to an older tag or commit
+    def deepen(self):
+        if not self.git.is_shallow():
+            return False
+
+        self.print('Fetching the full history of the shallow repository')
+        return not self.git.fetch('--unshallow --tags').returncode
+
     def update_patch(self):
         self.Updated = True
 
@@ -1844,6 +2612,7 @@ class repository(MetaData):
                 if msg:
                     self.print(msg)
                 else:
+                    self.update_index(release_dir)
                     files = self.check_releases(release_dir)
                     if files:
                         self.store_release(tag, files)
@@ -1897,43 +2666,72 @@ class repository(MetaData):
             if not os.path.exists(dir):
                 self.git.sub_add(submodules[name], name)
 
-    def build_rgbds(self, version):
+    # the target is the checkout to build, which is either the repository itself or one of its worktrees
+    def build_rgbds(self, version, target=None):
+        target = target or self
+        # make is run without a target, so the default target of the makefile is built
+        make_args = []
+        key = self.get_build_key(version, target, ' '.join(make_args))
+        files = self.Manager.BuildCache.get(key) if key else None
+
+        if files:
+            self.print('Using cached build of tree for: ' + target.build_name)
         # if new, successful build, copy any roms to build dir
-        rgbds_dir = self.manager.RGBDS.use('v' + version)
-        if not rgbds_dir or self.make.run(input='PATH="' + rgbds_dir + '":/root/.pyenv/shims:/root/.pyenv/bin:$PATH').returncode:
-            self.print('Build failed for: ' + self.build_name)
-            return False
         else:
-            files = get_builds(self.path['repo'])
-            if files:
+            rgbds_dir = self.manager.RGBDS.use('v' + version)
+            if not rgbds_dir or self.make.run(*make_args, input='PATH="' + rgbds_dir + '":/root/.pyenv/shims:/root/.pyenv/bin:$PATH', Directory=target.path['repo']).returncode:
+                self.print('Build failed for: ' + target.build_name)
+                return False
+
+            files = get_builds(target.path['repo'])
+
+            # the roms are then placed from the cache, so a later make cannot modify the cached files
+            if files and key:
+                self.Manager.BuildCache.set(key, files)
+                files = self.Manager.BuildCache.get(key) or files
+
+        if files:
+            branch = target.CurrentBranch
+
+            with self.Lock:
                 dirNames = []
-                if self.Manager.OnlyKeepLatestBuilds and self.CurrentBranch != "HEAD":
+                if self.Manager.OnlyKeepLatestBuilds and branch != "HEAD":
                     # get the list of dirs before copying
-                    dirNames = get_dirs(self.path['builds'] + self.CurrentBranch)
+                    dirNames = self.get_dirs(self.path['builds'] + branch)
                     
-                names = copy_files(files, self.build_dir)
-                self.print('Placed build file(s) in ' + self.build_dir + ': ' + ', '.join(names))
+                # the placed roms are copies, so patching them in place cannot modify the cached files
+                names = copy_files(files, target.build_dir)
+                self.print('Placed build file(s) in ' + target.build_dir + ': ' + ', '.join(names))
+                self.update_index(target.build_dir, names)
                 
-                self.store_build(self.CurrentBranch, self.build_name, files)
+                self.store_build(branch, target.build_name, files)
 
                 if dirNames:
                     dirs = []
                     for dirName in dirNames:
-                        dirs.append(self.path['builds'] + self.CurrentBranch + '/' + dirName)
-                        del self.builds[self.CurrentBranch][dirName]
+                        dirs.append(self.path['builds'] + branch + '/' + dirName)
+                        del self.builds[branch][dirName]
 
                     self.rmdir(dirs, 'Removing Previous Builds')
 
-                if self.GUI:
-                    if self.CurrentBranch == "HEAD":
-                        self.ReleaseSignal.emit()
-                    else:
-                        self.BuildSignal.emit()
+            if self.GUI:
+                if branch == "HEAD":
+                    self.ReleaseSignal.emit()
+                else:
+                    self.BuildSignal.emit()
 
-                return True
-            else:
-                self.print('No valid files found after build')
-                return False
+            return True
+        else:
+            self.print('No valid files found after build')
+            return False
+
+    # the build cache key of the checkout, or None if it has local changes (which are not part of the tree)
+    def get_build_key(self, version, target, make_target):
+        if self.git.is_dirty(Directory=target.path['repo']):
+            return None
+
+        tree = self.git.tree(Directory=target.path['repo'])
+        return self.Manager.BuildCache.key(tree, version, make_target, self.Manager.Environments.get('make').Name) if tree else None
 
     def find_build(self, *args):
         if len(args):
@@ -1960,7 +2758,81 @@ class repository(MetaData):
             self.git.switch('-')
             self.get_current_branch_info()
 
+# A separate checkout of a single branch, which shares the objects of the repository
+class Worktree:
+    def __init__(self, repo, branch):
+        self.Repo = repo
+        self.CurrentBranch = branch
+        self.Cleaned = False
+        self.path = {
+            'repo' : repo.path['worktrees'] + branch
+        }
+
+    # create the worktree if it doesnt exist, otherwise reuse it with the latest commit of the branch
+    def prepare(self):
+        git = self.Repo.git
+
+        if os.path.exists(self.path['repo']):
+            if not git.run('checkout -f --detach', self.CurrentBranch, Directory=self.path['repo']).returncode:
+                return self.update_submodules()
+
+            self.Repo.print('Removing invalid worktree: ' + self.CurrentBranch)
+            rmdir(self.path['repo'])
+
+        # remove the records of any worktrees which were deleted
+        git.run('worktree prune')
+
+        self.Repo.print('Creating worktree: ' + self.CurrentBranch)
+        if git.run('worktree add -f --detach "{0}"'.format(git.path(self.path['repo'])), self.CurrentBranch).returncode:
+            self.Repo.print('Failed to create worktree: ' + self.CurrentBranch)
+            return False
+
+        return self.update_submodules()
+
+    def update_submodules(self):
+        if os.path.exists(self.path['repo'] + '/.gitmodules'):
+            self.Repo.git.sub_update(Directory=self.path['repo'])
+
+        return True
+
+    def process_make(self, sequence):
+        self.Cleaned = False
+        for process in sequence:
+            if process == 'b':
+                self.build()
+            elif process == 'c':
+                self.clean()
+
+    def clean(self):
+        if not self.Cleaned:
+            self.Repo.print('Cleaning worktree: ' + self.CurrentBranch)
+            self.Repo.make.clean(Directory=self.path['repo'])
+            self.Cleaned = True
+
+    def build(self):
+        repo = self.Repo
+        self.Cleaned = False
+
+        version = repo.RGBDS or repo.rgbds
+        commit = repo.git.head(Directory=self.path['repo'])
+        date = repo.git.date(Directory=self.path['repo'])
+
+        self.build_name = date[:10] + ' ' + commit[:8] + ' (' + version + ')'
+        self.build_dir = repo.path['builds'] + self.CurrentBranch + '/' + self.build_name + '/'
+
+        with repo.Lock:
+            alreadyBuilt = self.CurrentBranch in repo.builds and self.build_name in repo.builds[self.CurrentBranch]
+
+        if alreadyBuilt:
+            repo.print('Commit has already been built: ' + self.build_name)
+        elif version and version != "None":
+            repo.print('Building ' + self.CurrentBranch + ' with RGBDS v' + version)
+            repo.build_rgbds(version, self)
+
 class RGBDS(repository):
+    # the releases are cleaned when scanned, so always scan
+    Cacheable = False
+
     def __init__(self, *args):
         super().__init__(*args)
 
@@ -1985,8 +2857,8 @@ class RGBDS(repository):
     def setFavorites(self, favorites, addToList=True):
         super().setFavorites(favorites, False)
 
-    def refresh(self):
-        result = super().refresh()
+    def refresh(self, *args):
+        result = super().refresh(*args)
         self.Refreshed = False
         return result
 
@@ -1999,7 +2871,8 @@ class RGBDS(repository):
         pass
 
     def check_releases(self, dir):
-        return get_all_files(dir)
+        index = self.get_index(dir)
+        return index.entries() if index else []
     
     def store_release(self, tag, files):
         self.releases[tag] = files[0].parts[-2]
@@ -2015,8 +2888,8 @@ class RGBDS(repository):
                 self.ReleaseIDs.insert(0, tag)
 
     def clean_releases(self):
-        if os.path.exists(self.path['releases']):
-            for dirname in get_dirs(self.path['releases']):
+        if self.get_index(self.path['releases']):
+            for dirname in self.get_dirs(self.path['releases']):
                 release_dir = self.path['releases'] + dirname
                 error_message = ''
 
@@ -2040,7 +2913,7 @@ class RGBDS(repository):
                     self.rmdir(release_dir, error_message)
 
             # if the releases directory is empty, then delete
-            if not get_dirs(self.path['releases']):
+            if not self.get_dirs(self.path['releases']):
                 self.rmdir(self.path['releases'], 'Release directory is empty')
 
     def parse_builds(self):
@@ -2052,36 +2925,36 @@ class RGBDS(repository):
             'win32' : {}
         }
         
-        for version in get_dirs(self.path['builds']):
+        for version in self.get_dirs(self.path['builds']):
             version_dir = self.path['builds'] + version
 
-            for type in get_dirs(version_dir):
+            for type in self.get_dirs(version_dir):
                 if type in self.builds:
                     build_dir = version_dir + '/' + type
 
-                    if get_all_files(build_dir):
+                    if self.check_releases(build_dir):
                         self.builds[type][version] = build_dir
 
     def clean_builds(self):
-        if os.path.exists(self.path['builds']):
-            for version in get_dirs(self.path['builds']):
+        if self.get_index(self.path['builds']):
+            for version in self.get_dirs(self.path['builds']):
                 version_dir = self.path['builds'] + version
-                for type in get_dirs(version_dir):
+                for type in self.get_dirs(version_dir):
                     build_dir = version_dir + '/' + type
                     error_message = ''
 
                     if type not in ['linux', 'win64', 'win32']:
                         error_message = 'Invalid build type: ' + type
-                    elif not get_all_files(build_dir):
+                    elif not self.check_releases(build_dir):
                         error_message = 'Missing valid build files in pre-existing directory: ' + version + '/' + type
                     
                     if error_message:
                         self.rmdir(build_dir, error_message)
 
-                if not get_dirs(version_dir):
+                if not self.get_dirs(version_dir):
                     self.rmdir(version_dir, 'Version directory has no builds: ' + version)
 
-            if not get_dirs(self.path['builds']):
+            if not self.get_dirs(self.path['builds']):
                 self.rmdir(self.path['builds'], 'Build directory is empty')
 
     def build(self, version):
@@ -2138,6 +3011,8 @@ class RGBDS(repository):
                 self.print("Failed to extract " + archives[0])
                 return False
 
+            self.update_index(extraction_dir)
+
             # If the extraction was successful, check for the keyfile
             keyfile_path = find(extraction_dir + '/**/' + keyfile, recursive=True)
 
@@ -2164,20 +3039,24 @@ class RGBDS(repository):
         else:
             files = get_all_files(keyfile_dir)
 
-        copy_files(files, build_dir)
+        names = copy_files(files, build_dir)
+        self.update_index(build_dir, names)
         self.print('Placed RGBDS ' + version + ' files into ' + build_dir)
         self.builds[type][version] =  build_dir
         return True
 
     def use(self, version):
         environment = self.Manager.Environments.get('make')
-        if version not in self.builds[environment.Type]:
-            self.print('RGBDS build not found: ' + version)
-            self.print('Building RGBDS version: ' + version)
 
-            if not self.build(version):
-                self.print('Version {0} is not available'.format(version))
-                return ''
+        # multiple jobs may request the same version at once, so only build it once
+        with self.Lock:
+            if version not in self.builds[environment.Type]:
+                self.print('RGBDS build not found: ' + version)
+                self.print('Building RGBDS version: ' + version)
+
+                if not self.build(version):
+                    self.print('Version {0} is not available'.format(version))
+                    return ''
         
         return environment.path(self.builds[environment.Type][version])
 
@@ -2194,6 +3073,14 @@ if __name__ == '__main__':
     parser.add_argument('-exclude-tags', '-xt', nargs='+', help='Tags(s) to not manage')
     parser.add_argument('-process', '-p', nargs='*', help='The processes to run on the managed repositories')
     parser.add_argument('-build', '-b', nargs='*', help='Build options')
+    parser.add_argument('-jobs', '-j', nargs=1, type=int, help='Number of repositories to process at once')
+    parser.add_argument('-network-jobs', '-nj', nargs=1, type=int, help='Number of repositories to refresh/update at once while others are building')
+    parser.add_argument('-refresh-jobs', '-rj', nargs=1, type=int, help='Number of remote queries to run at once when refreshing')
+    parser.add_argument('-worktrees', '-wt', nargs=1, type=int, help='Number of branches to build at once, each in its own worktree (0 to switch branches instead)')
+    parser.add_argument('-shared-objects', '-so', action='store_true', help='Clone forks of the same basis using a shared object store')
+    parser.add_argument('-export-metadata', '-em', action='store_true', help='Write the metadata.json file of each repository from the state database')
+    parser.add_argument('-cold-start', '--cold-start', '-cs', action='store_true', help='Ignore the startup cache, and parse the catalog and scan each repository again')
+    parser.add_argument('-force-refresh', '--force-refresh', '-fr', action='store_true', help='Ignore any cached remote branches, tags and releases')
 
     import time
     start_time = time.time()
@@ -0,0 +1,82 @@
+import os, time, hashlib, platform, uuid
+from src.Files import *
+
+# Stores the output of each build, keyed by the git tree it was built from, the RGBDS version, the make target
+# and the environment which ran make
+# The same tree will always produce the same roms, regardless of the branch, tag or commit it is reached from
+class BuildCache:
+    def __init__(self, manager, path):
+        self.Manager = manager
+        self.Path = path
+
+    def key(self, tree, version, target, environment):
+        return hashlib.sha1('{0}|{1}|{2}|{3}|{4}|{5}'.format(tree, version, target, environment, platform.system(), platform.machine()).encode('utf-8')).hexdigest()
+
+    # Returns the cached files for the key, or None if it has not been built
+    def get(self, key):
+        path = self.Path + key + '/'
+
+        if os.path.exists(path):
+            files = get_all_files(path)
+            if files:
+                # the least recently used entries are pruned first
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+
+                return files
+
+        return None
+
+    def set(self, key, files):
+        path = self.Path + key + '/'
+
+        if os.path.exists(path):
+            return
+
+        # copy into a temporary directory first, so a partial entry is never visible to other jobs
+        temp = self.Path + 'tmp-' + uuid.uuid4().hex + '/'
+        copy_files(files, temp)
+
+        try:
+            os.rename(temp, path)
+        except OSError:
+            # another job stored the same build first
+            rmdir(temp)
+
+    # remove the least recently used entries until the cache fits within the size, in MB
+    def prune(self, size):
+        if not os.path.exists(self.Path):
+            return
+
+        entries = []
+        total = 0
+        for name in os.listdir(self.Path):
+            path = self.Path + name + '/'
+
+            # a temporary directory is either being stored, or was left by a terminated job
+            if name.startswith('tmp-'):
+                try:
+                    if time.time() - os.stat(path).st_mtime > 24 * 60 * 60:
+                        rmdir(path)
+                except OSError:
+                    pass
+                continue
+
+            entry_size = get_size(path)
+            total += entry_size
+            entries.append((os.stat(path).st_mtime, path, entry_size))
+
+        limit = size * 1024 * 1024
+        removed = 0
+        for mtime, path, entry_size in sorted(entries):
+            if total <= limit:
+                break
+
+            rmdir(path)
+            total -= entry_size
+            removed += 1
+
+        if removed:
+            self.Manager.print('Removed {0} builds from the build cache, which is now {1}'.format(removed, format_size(total)))
@@ -0,0 +1,173 @@
+import os, json, pickle, hashlib, uuid, threading
+from pathlib import Path
+from src.Files import *
+
+def get_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+# the scanned properties are nested dicts of file paths, which are stored as strings since those are much faster to unpickle
+def freeze(value):
+    if isinstance(value, dict):
+        return { key : freeze(item) for key, item in value.items() }
+    return str(value)
+
+def thaw(value):
+    if isinstance(value, dict):
+        return { key : thaw(item) for key, item in value.items() }
+    return Path(value)
+
+# A binary snapshot of the parsed catalog files, and the builds, releases and patches found for each repository
+# Each entry is validated by the modification times of the files and directories it was read from,
+# so a warm start only needs to stat them instead of listing and parsing them again
+class CatalogCache:
+    Version = 2
+
+    def __init__(self, manager, path):
+        self.Manager = manager
+        self.Path = path
+        self.Cold = False
+        self.Modified = False
+        self.Lock = threading.RLock()
+        self.Hits = 0
+        self.Misses = 0
+        self.Data = self.empty()
+
+    def empty(self):
+        return { 'Version' : CatalogCache.Version, 'Files' : {}, 'Repos' : {} }
+
+    def load(self):
+        self.Data = self.empty()
+        self.Modified = self.Cold
+        self.Hits = self.Misses = 0
+
+        if self.Cold or not os.path.exists(self.Path):
+            return
+
+        try:
+            with open(self.Path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception:
+            return
+
+        if isinstance(data, dict) and data.get('Version') == CatalogCache.Version:
+            self.Data = data
+
+    def save(self):
+        with self.Lock:
+            if not self.Modified:
+                return
+
+            # write to a temporary file first, so a partial cache is never read
+            mkdir(dir_only(self.Path))
+            temp = self.Path + '.' + uuid.uuid4().hex
+            with open(temp, 'wb') as f:
+                pickle.dump(self.Data, f, pickle.HIGHEST_PROTOCOL)
+
+            os.replace(temp, self.Path)
+            self.Modified = False
+
+    # returns the content of the json file, parsing it only if it changed since it was cached
+    def read_json(self, path):
+        stamp = get_stamp(path)
+        entry = self.Data['Files'].get(path)
+
+        if entry and entry[0] == stamp:
+            return pickle.loads(entry[1])
+
+        data = read_json(path)
+        self.Data['Files'][path] = (stamp, pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+        self.Modified = True
+        return data
+
+    # the modification time of each directory the scans of the repository read
+    def get_stamps(self, repo):
+        stamps = {}
+        for name in ['builds', 'releases', 'patches']:
+            index = repo.get_index(repo.path[name])
+            for path in (index.loaded() if index else [repo.path[name]]):
+                stamps[path] = get_stamp(path)
+        return stamps
+
+    # the directories which were read when the repository was last scanned
+    def get_paths(self, repo):
+        with self.Lock:
+            entry = self.Data['Repos'].get(repo.path['base'])
+            return list(entry['Stamps']) if entry else []
+
+    # the releases which are found depend on the tags stored in the metadata
+    def get_tags_key(self, repo):
+        return hashlib.sha1(self.Manager.StateStore.get_raw(repo.path['base'], 'GitTags').encode('utf-8')).hexdigest()
+
+    def isCacheable(self, repo):
+        # builds of a detached HEAD are keyed by the current commit, which is not tracked here
+        return repo.Cacheable and not os.path.exists(repo.path['builds'] + 'HEAD')
+
+    # the flags of a repository depend on all of its stored metadata
+    def get_metadata_key(self, repo):
+        data = self.Manager.StateStore.get_all_raw(repo.path['base'])
+        return hashlib.sha1(json.dumps(sorted(data.items())).encode('utf-8')).hexdigest()
+
+    # returns the entry of the repository, if none of its directories have changed
+    def get_entry(self, repo):
+        entry = self.Data['Repos'].get(repo.path['base'])
+
+        if not entry or not self.isCacheable(repo):
+            return None
+
+        for path, stamp in entry['Stamps'].items():
+            if get_stamp(path) != stamp:
+                return None
+
+        return entry
+
+    # restore the scanned properties of the repository, if none of its directories have changed
+    def restore(self, repo):
+        entry = self.get_entry(repo)
+
+        if not entry or entry['Tags'] != self.get_tags_key(repo):
+            self.Misses += 1
+            return False
+
+        for name, value in entry['State'].items():
+            setattr(repo, name, thaw(value))
+
+        self.Hits += 1
+        return True
+
+    def store(self, repo):
+        if self.isCacheable(repo):
+            entry = {
+                'Stamps' : self.get_stamps(repo),
+                'Tags' : self.get_tags_key(repo),
+                'State' : { name : freeze(getattr(repo, name)) for name in repo.ScanProperties }
+            }
+
+            with self.Lock:
+                self.Data['Repos'][repo.path['base']] = entry
+                self.Modified = True
+
+    # returns the flags of the repository from when it was last hydrated, if it has not changed since
+    def get_flags(self, repo):
+        entry = self.Data['Repos'].get(repo.path['base'])
+
+        if not entry or 'Flags' not in entry or entry['Flags']['Missing'] != repo.Missing:
+            return None
+
+        if entry['MetaData'] != self.get_metadata_key(repo) or not self.get_entry(repo):
+            return None
+
+        return entry['Flags']
+
+    def store_flags(self, repo):
+        entry = self.Data['Repos'].get(repo.path['base'])
+
+        if entry and self.isCacheable(repo):
+            with self.Lock:
+                entry['Flags'] = { name : getattr(repo, name) for name in repo.CachedFlags }
+                entry['MetaData'] = self.get_metadata_key(repo)
+                self.Modified = True
@@ -0,0 +1,146 @@
+import os
+from pathlib import Path
+from src.Files import *
+
+# The contents of a directory, read with a single os.scandir call the first time they are needed
+# Each subdirectory is indexed the same way, so a directory is only read once no matter how many times it is checked
+class DirectoryIndex:
+    def __init__(self, path):
+        self.Path = clean_path(path + '/')
+        self.Loaded = False
+        self.Exists = False
+        self.Dirs = {}
+        self.Files = {}
+        self.Stats = {}
+
+    def load(self):
+        if not self.Loaded:
+            self.Loaded = True
+
+            try:
+                with os.scandir(self.Path) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            self.Dirs[entry.name] = DirectoryIndex(self.Path + entry.name)
+                        else:
+                            # the path of each file is only created when it is needed
+                            self.Files[entry.name] = None
+
+                self.Exists = True
+            except OSError:
+                pass
+
+        return self
+
+    def exists(self):
+        return self.load().Exists
+
+    def dirs(self):
+        return list(self.load().Dirs)
+
+    def get(self, name):
+        return self.load().Dirs.get(name)
+
+    # the subdirectories of the directory, and their indexes
+    def items(self):
+        return list(self.load().Dirs.items())
+
+    # the files of the directory, optionally only those with one of the extensions
+    def files(self, extensions=None):
+        files = []
+        for name, file in self.load().Files.items():
+            if extensions is None or os.path.splitext(name)[1][1:] in extensions:
+                if file is None:
+                    file = self.Files[name] = Path(self.Path + name)
+                files.append(file)
+        return files
+
+    # the files and directories of the directory, like get_all_files
+    def entries(self):
+        return self.files() + [Path(self.Path + name) for name in self.Dirs]
+
+    # the stat result of a file in the directory, which is only read once
+    def stat(self, file):
+        if file.name not in self.Stats:
+            self.Stats[file.name] = os.stat(file)
+        return self.Stats[file.name]
+
+    # the paths of this directory, and every directory below it which has been read
+    def loaded(self):
+        paths = [self.Path]
+        for node in self.Dirs.values():
+            if node.Loaded:
+                paths += node.loaded()
+        return paths
+
+    # the parts of the path below this directory, or None if it is not below it
+    def split(self, path):
+        path = clean_path(path + '/')
+        if not path.startswith(self.Path):
+            return None
+
+        return [part for part in path[len(self.Path):].split('/') if part]
+
+    # returns the index of a directory below this one, or None if it does not exist
+    def find(self, path):
+        parts = self.split(path)
+        if parts is None:
+            return None
+
+        node = self
+        for part in parts:
+            node = node.get(part)
+            if not node:
+                return None
+
+        return node
+
+    # returns the index of a directory below this one without reading anything, creating the indexes of any new directories
+    # or None if one of its parents has not been read yet, since reading it later will include the directory
+    def make(self, path, create=True):
+        parts = self.split(path)
+        if parts is None:
+            return None
+
+        node = self
+        for part in parts:
+            if not node.Loaded:
+                return None
+
+            if part not in node.Dirs:
+                if not create:
+                    return None
+
+                node.Exists = True
+                node.Dirs[part] = DirectoryIndex(node.Path + part)
+
+            node = node.Dirs[part]
+
+        return node
+
+    # read the directory again the next time it is needed, i.e. after it was modified outside of the index
+    def invalidate(self, path):
+        node = self.make(path)
+        if node:
+            node.__init__(node.Path)
+
+    # record files which were placed into a directory
+    def add(self, path, names):
+        node = self.make(path)
+
+        if node and node.Loaded:
+            for name in names:
+                node.Files[name] = None
+                node.Stats.pop(name, None)
+
+    # forget a directory or file which was removed
+    def remove(self, path):
+        parts = self.split(path)
+        if not parts:
+            return
+
+        parent = self.make(self.Path + '/'.join(parts[:-1]), False)
+        if parent and parent.Loaded:
+            parent.Dirs.pop(parts[-1], None)
+            parent.Files.pop(parts[-1], None)
+            parent.Stats.pop(parts[-1], None)
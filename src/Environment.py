@@ -1,5 +1,14 @@
-import os, subprocess, platform, json
+import os, subprocess, platform, json, threading, signal, zlib
 from src.Files import *
+from src.GitReader import GitReader, GitReaderError
+from src.Shell import ShellSessionPool, ShellSessionError
+
+# send a signal to the process and any children it started
+def signal_process(process, sig):
+    if platform.system() == 'Windows':
+        os.kill(process.pid, sig)
+    else:
+        os.killpg(process.pid, sig)
 
 def addToInput(options, *inputs):
     if "input" in options:
@@ -11,6 +20,42 @@ class EmptyReturn:
     def __init__(self):
         self.returncode = 1
 
+# The output lines of a streamed process
+# The process is killed and reaped once the lines are closed or no longer referenced, even if they were never read
+class ProcessLines:
+    def __init__(self, environment, process, input, timeout):
+        self.Environment = environment
+        self.Process = process
+        self.Lines = environment.readlines(process, input, timeout)
+        self.Closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.Lines)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        if not self.Closed:
+            self.Closed = True
+            self.Lines.close()
+
+            # the generator only cleans up if it was started
+            self.Environment.kill(self.Process)
+            if self.Process.stdout:
+                self.Process.stdout.close()
+            self.Process.wait()
+            self.Environment.Environments.Manager.removeProcess(self.Process)
+
 class Environment:
     def __init__(self, environments, name, type):
         self.Environments = environments
@@ -19,16 +64,32 @@ class Environment:
 
     def path(self, path):
         return clean_path(path)
+
+    # returns the program to launch and the options to launch it with for the given command
+    def prepare(self, command, options):
+        return command, options
     
     def run(self, command, options):
+        process = None
+        stdout = False
+        command, options = self.prepare(command, options)
+
+        # dont start any new commands once the process has been terminated
+        if self.Environments.Manager.Cancelled:
+            return [''] if options.get('capture_output') or options.get('stream') else EmptyReturn()
+
         try:
             parameters = {}
 
             if platform.system() == 'Windows':
                 parameters['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+            else:
+                parameters['start_new_session'] = True
             
             input = ''
-            stdout = False
+            timeout = None
+            stream = False
+            log = None
 
             for key, value in options.items():
                 if key == 'capture_output':
@@ -38,39 +99,132 @@ class Environment:
                 elif key == 'input':
                     input = value
                     parameters['stdin'] = subprocess.PIPE
+                elif key == 'timeout':
+                    timeout = value
+                elif key == 'stream':
+                    if value:
+                        stream = stdout = True
+                        parameters['stdout'] = subprocess.PIPE
+                elif key == 'log':
+                    if value:
+                        log = value
+                        parameters['stdout'] = subprocess.PIPE
+                        parameters['stderr'] = subprocess.STDOUT
                 else:
                     parameters[key] = value
 
+            if stream or log:
+                parameters['bufsize'] = 1
+
             process = subprocess.Popen(command, **parameters)
-            self.Environments.Manager.setProcess(process)
+            self.Environments.Manager.addProcess(process)
+
+            # yield the output lines as they arrive instead of buffering until exit
+            if stream:
+                return ProcessLines(self, process, input, timeout)
+
+            if log:
+                for line in self.readlines(process, input, timeout):
+                    log(line)
+
+                return process
             
+            # block until the process exits, is terminated, or times out
             output = ''
             if input or stdout:
-                output, err = process.communicate(input)
-
-            while process.poll() is None:
-                pass
+                output, err = process.communicate(input, timeout=timeout)
+            else:
+                process.wait(timeout)
 
-            self.Environments.Manager.setProcess(None)
+            self.Environments.Manager.removeProcess(process)
 
             return output.split('\n') if stdout else process
-            
+
+        except subprocess.TimeoutExpired:
+            self.kill(process)
+            self.Environments.Manager.removeProcess(process, 'Timed out after {0} seconds: {1}'.format(timeout, options.get('input', command)))
+            return [''] if stdout else EmptyReturn()
+
+        except KeyboardInterrupt:
+            self.kill(process)
+            self.Environments.Manager.removeProcess(process)
+            raise
+
         except Exception:
-            self.Environments.Manager.setProcess(None, 'Error executing ' + self.Name + ' Environment')
+            self.Environments.Manager.removeProcess(process, 'Error executing ' + self.Name + ' Environment')
             if stdout:
                 return ['']
             else:
                 return EmptyReturn()
 
+    def readlines(self, process, input, timeout):
+        timer = None
+        try:
+            if timeout:
+                timer = threading.Timer(timeout, self.timeout, [process, timeout])
+                timer.start()
+
+            if input:
+                process.stdin.write(input)
+                process.stdin.close()
+
+            # reading from the pipe applies backpressure to the child when the consumer falls behind
+            for line in process.stdout:
+                yield line.rstrip('\n')
+
+            process.wait()
+        except OSError:
+            self.Environments.Manager.print('Error reading output from ' + self.Name + ' Environment')
+        finally:
+            if timer:
+                timer.cancel()
+
+            # if the consumer stopped early, the process is no longer needed
+            self.kill(process)
+            self.Environments.Manager.removeProcess(process)
+
+    def timeout(self, process, timeout):
+        self.Environments.Manager.print('Timed out after {0} seconds'.format(timeout))
+        self.kill(process, False)
+
+    def kill(self, process, wait=True):
+        if process and process.poll() is None:
+            try:
+                if platform.system() == 'Windows':
+                    process.kill()
+                else:
+                    signal_process(process, signal.SIGKILL)
+            except OSError:
+                pass
+
+            if wait:
+                process.communicate()
+
 class AppEnvironment(Environment):
     def __init__(self, environments, name, app, type):
         super().__init__(environments, name, type)
         self.App = app
+        self.Sessions = ShellSessionPool(self)
+
+    # run the command in a reused shell session, unless it needs to be streamed or timed out
+    def run(self, command, options):
+        if not self.Environments.Manager.Settings.get('Processing.ShellSessions') or options.get('stream') or options.get('timeout'):
+            return super().run(command, options)
+
+        if self.Environments.Manager.Cancelled:
+            return [''] if options.get('capture_output') else EmptyReturn()
+
+        app, sessionOptions = self.prepare(command, dict(options))
+
+        try:
+            return self.Sessions.run(app, sessionOptions)
+        except ShellSessionError:
+            return super().run(command, options)
 
     def path(self, path):
         return super().path(os.path.abspath(path))
 
-    def run(self, command, options):
+    def prepare(self, command, options):
         addToInput(options, command)
 
         if callable(self.App):
@@ -78,7 +232,7 @@ class AppEnvironment(Environment):
         else:
             app = self.App
 
-        return super().run(app, options)
+        return super().prepare(app, options)
  
 class Linux(AppEnvironment):
     def __init__(self, environments, name, app):
@@ -95,9 +249,9 @@ class Windows(AppEnvironment):
     def __init__(self, environments, name, app):
         super().__init__(environments, name, app, environments.WindowsBit)
 
-    def run(self, command, options):
+    def prepare(self, command, options):
         addToInput(options, 'cd "' + self.path(options['cwd']) + '"')
-        return super().run(command, options)
+        return super().prepare(command, options)
 
 class Cygwin(Windows):
     def __init__(self, environments, name):
@@ -136,6 +290,7 @@ class Command:
         self.set_parameter("Encoding", kwargs, 'utf-8')
         self.set_parameter("CaptureOutput", kwargs, False)
         self.set_parameter("Directory", kwargs, '.')
+        self.set_parameter("Timeout", kwargs, None)
 
     def path(self, path):
         return self.Environments.get(self.Command).path(path)
@@ -146,23 +301,46 @@ class Command:
     def get_parameter(self, key, kwargs):
         return kwargs[key] if key in kwargs else getattr(self, key)
 
-    def run(self, *args, **kwargs):
+    def get_parameters(self, kwargs):
         parameters = {
             'cwd' : self.get_parameter('Directory', kwargs),
             'capture_output' : self.get_parameter('CaptureOutput', kwargs),
-            'encoding' : self.get_parameter('Encoding', kwargs)
+            'encoding' : self.get_parameter('Encoding', kwargs),
+            'timeout' : self.get_parameter('Timeout', kwargs)
         }
 
         if 'input' in kwargs:
             parameters['input']  = kwargs['input']
 
-        return self.Environments.get(self.Command).run(self.Command + ' ' + ' '.join(args), parameters)
+        if kwargs.get('Stream'):
+            parameters['stream'] = True
+
+        if kwargs.get('Log'):
+            parameters['log'] = kwargs['Log']
+
+        return parameters
+
+    # returns the environment, program and options needed to launch the command outside of 'run'
+    def prepare(self, *args, **kwargs):
+        environment = self.Environments.get(self.Command)
+        program, options = environment.prepare(self.Command + ' ' + ' '.join(args), self.get_parameters(kwargs))
+        return environment, program, options
+
+    def run(self, *args, **kwargs):
+        return self.Environments.get(self.Command).run(self.Command + ' ' + ' '.join(args), self.get_parameters(kwargs))
 
 class GameCommand(Command):
     def __init__(self, command, game, **options):
         self.Game = game
         super().__init__(command, game.Manager.Environments, Directory=game.path['repo'], **options)
 
+    def run(self, *args, **kwargs):
+        # route the output of uncaptured commands to the game log if enabled
+        if 'Log' not in kwargs and not self.get_parameter('CaptureOutput', kwargs) and self.Game.Manager.ShowLogs:
+            kwargs['Log'] = self.Game.print
+
+        return super().run(*args, **kwargs)
+
 class Github(Command):
     def __init__(self, game):
         self.Game = game
@@ -195,9 +373,22 @@ class Github(Command):
         return 'Release has no assets:' + id
 
 class Git(GameCommand):
+    # read-only queries are answered from the repository files when possible, instead of starting a process
+    UseReader = True
+
     def __init__(self, game):
         super().__init__('git', game)
 
+    # returns the result of the reader method, or None if the layout is not supported
+    def read(self, method, *args, **options):
+        if Git.UseReader:
+            try:
+                return getattr(GitReader(self.get_parameter('Directory', options)), method)(*args)
+            except (GitReaderError, OSError, ValueError, IndexError, zlib.error):
+                pass
+
+        return None
+
     def clone(self, *args, **options):
         path = self.path(self.Game.path['repo'])
         return self.run('clone {0} "{1}"'.format(self.Game.url, path), *args, Directory='.', **options)
@@ -215,16 +406,50 @@ class Git(GameCommand):
         return self.run('switch -f', *args, **options)
 
     def list(self, which, *args, **options):
-        return self.run('ls-remote --' + which, *args, CaptureOutput=True, **options)
+        return self.run('ls-remote --' + which, *args, Stream=True, **options)
 
     def get(self, *args, **options):
+        if len(args) == 1:
+            value = self.read('config', *args, **options)
+            if value is not None:
+                return [value]
+
         return self.run('config --get', *args, CaptureOutput=True, **options)
 
     def date(self, *args, **options):
-        return self.run('--no-pager log -1 --format=%ai', *args, CaptureOutput=True, **options)[0]
+        return (len(args) < 2 and self.read('date', *args, **options)) or self.run('--no-pager log -1 --format=%ai', *args, CaptureOutput=True, **options)[0]
 
     def head(self, *args, **options):
-        return self.run('rev-parse HEAD', *args, CaptureOutput=True, **options)[0]
+        return (not args and self.read('head', **options)) or self.run('rev-parse HEAD', *args, CaptureOutput=True, **options)[0]
+
+    # the commit id of the ref, or an empty string if it doesnt exist
+    def resolve(self, ref, **options):
+        return self.read('resolve', ref, **options) or self.run('rev-parse --verify -q', ref, CaptureOutput=True, **options)[0]
+
+    # the name of the current branch, or 'HEAD' if detached
+    def current_branch(self, *args, **options):
+        return (not args and self.read('branch', **options)) or self.run('rev-parse --abbrev-ref HEAD', *args, CaptureOutput=True, **options)[0]
+
+    def tree(self, *args, **options):
+        return self.run('rev-parse "HEAD^{tree}"', *args, CaptureOutput=True, **options)[0]
+
+    def is_shallow(self, *args, **options):
+        shallow = None if args else self.read('shallow', **options)
+        if shallow is not None:
+            return shallow
+
+        return self.run('rev-parse --is-shallow-repository', *args, CaptureOutput=True, **options)[0] == 'true'
+
+    # the names of the tags which point at the commit
+    def points_at(self, commit, **options):
+        tags = self.read('tags', commit, **options)
+        if tags is not None:
+            return tags
+
+        return [tag for tag in self.run('tag --points-at', commit, CaptureOutput=True, **options) if tag]
+
+    def is_dirty(self, *args, **options):
+        return any(self.run('status --porcelain --untracked-files=no', *args, CaptureOutput=True, **options))
 
     def sub_url(self, *args, **options):
         return self.run('submodule set-url', *args, **options)
@@ -291,6 +516,15 @@ class Environments:
             'w64devkit' : 'w64devkit'
         }
 
+    # print the number of shells started by each environment, and the time saved by reusing them
+    def report(self):
+        for environment in self.Map.values():
+            if isinstance(environment, AppEnvironment):
+                spawns, commands, saved = environment.Sessions.getStats()
+
+                if commands:
+                    self.Manager.print('{0} Environment ran {1} commands in {2} new shell sessions, saving ~{3:.1f}s of startup time'.format(environment.Name, commands, spawns, saved))
+
     def get(self, command):
         # if main environment is linux, then all commands use Linux environment
         if self.Main == 'linux':
@@ -0,0 +1,293 @@
+import os, time, errno, select, struct, ctypes, ctypes.util, platform, threading, traceback
+
+# the inotify events which change the contents of a directory
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ONLYDIR = 0x01000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+Mask = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+
+# the directories of a repository which are scanned, which are the only changes to its base directory that matter
+scanned_dirs = ['builds', 'releases', 'patches']
+
+# Watches directories with inotify, through libc
+class Inotify:
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.FD = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+
+        if self.FD < 0:
+            raise OSError(ctypes.get_errno(), 'Failed to initialize inotify')
+
+        self.Paths = {}
+        self.Watches = {}
+
+    # returns False if the directory cannot be watched, i.e. it does not exist
+    def add(self, path):
+        wd = self.libc.inotify_add_watch(self.FD, os.fsencode(path), Mask)
+
+        if wd < 0:
+            code = ctypes.get_errno()
+            # the limit of watches was reached
+            if code == errno.ENOSPC:
+                raise OSError(code, 'Too many directories to watch with inotify')
+            return False
+
+        self.Paths[path] = wd
+        self.Watches[wd] = path
+        return True
+
+    def remove(self, path):
+        wd = self.Paths.pop(path, None)
+        if wd is not None and self.Watches.pop(wd, None):
+            self.libc.inotify_rm_watch(self.FD, wd)
+
+    # returns the changed directories and the names of the changed entries, once any are available
+    # a None directory means events were dropped, so everything may have changed
+    def read(self, timeout):
+        if not select.select([self.FD], [], [], timeout)[0]:
+            return []
+
+        try:
+            data = os.read(self.FD, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changes = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = struct.unpack_from('iIII', data, offset)
+            name = data[offset + 16 : offset + 16 + length].rstrip(b'\0')
+            offset += 16 + length
+
+            if mask & IN_Q_OVERFLOW:
+                changes.append((None, None))
+            elif mask & IN_IGNORED:
+                # the directory was removed, so is no longer watched
+                path = self.Watches.pop(wd, None)
+                if path is not None:
+                    self.Paths.pop(path, None)
+            elif wd in self.Watches:
+                changes.append((self.Watches[wd], os.fsdecode(name) if name else None))
+
+        return changes
+
+    def close(self):
+        os.close(self.FD)
+
+# Watches directories by comparing their modification times every interval
+class Poller:
+    def __init__(self, interval):
+        self.Interval = interval
+        self.Paths = {}
+
+    def get_stamp(self, path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def add(self, path):
+        self.Paths[path] = self.get_stamp(path)
+        return True
+
+    def remove(self, path):
+        self.Paths.pop(path, None)
+
+    def read(self, timeout):
+        time.sleep(self.Interval)
+
+        changes = []
+        for path, stamp in list(self.Paths.items()):
+            current = self.get_stamp(path)
+            if current != stamp:
+                self.Paths[path] = current
+                changes.append((path, None))
+
+        return changes
+
+    def close(self):
+        pass
+
+# Keeps the builds, releases and patches of each repository up to date with changes made outside of the manager
+# Each directory which was scanned is watched, and the changes are collected until they stop for the delay,
+# so that a burst of changes only updates each repository once
+class FileWatcher:
+    # how often the watched directories are compared to the repositories, in case they were scanned elsewhere
+    SyncInterval = 30
+
+    def __init__(self, manager):
+        self.Manager = manager
+        self.Thread = None
+        self.Backend = None
+        self.Mode = None
+        self.Owners = {}
+        self.Pending = {}
+        self.First = None
+        self.Last = None
+        self.LastSync = None
+        # the changes of the repositories which are being processed, until they are finished
+        self.Deferred = {}
+        self.DeferredLock = threading.Lock()
+
+    def start(self):
+        if not self.Thread:
+            self.Thread = threading.Thread(target=self.run, daemon=True)
+            self.Thread.start()
+
+    def run(self):
+        while True:
+            try:
+                self.step()
+            except Exception:
+                self.Manager.print('File Watcher Error:\n' + traceback.format_exc())
+                self.set_backend(None)
+                time.sleep(self.Manager.Settings.get('Watcher.Interval'))
+
+    def get_mode(self):
+        mode = self.Manager.Settings.get('Watcher.Mode')
+
+        if mode == 'auto':
+            return 'inotify' if platform.system() == 'Linux' else 'poll'
+
+        return mode if mode in ['inotify', 'poll'] else None
+
+    def set_backend(self, mode):
+        if self.Backend:
+            self.Backend.close()
+
+        self.Backend = None
+        self.Mode = mode
+        self.Owners = {}
+        self.Pending = {}
+        self.LastSync = None
+
+        if mode == 'inotify':
+            try:
+                self.Backend = Inotify()
+            except (OSError, AttributeError):
+                self.Manager.print('inotify is not available, polling for file changes instead')
+                mode = 'poll'
+
+        if mode == 'poll':
+            self.Backend = Poller(self.Manager.Settings.get('Watcher.Interval'))
+
+    def step(self):
+        mode = self.get_mode()
+        if mode != self.Mode:
+            self.set_backend(mode)
+
+        if not self.Backend:
+            time.sleep(1)
+            return
+
+        if self.LastSync is None or time.time() - self.LastSync > self.SyncInterval:
+            self.sync()
+
+        delay = self.Manager.Settings.get('Watcher.Delay')
+        changes = self.Backend.read(delay if self.Pending else 1)
+
+        now = time.time()
+        for path, name in changes:
+            self.changed(path, name, now)
+
+        # wait until the changes stop, but not forever
+        if self.Pending and (now - self.Last >= delay or now - self.First >= 10 * delay):
+            self.flush()
+
+    # watch the scanned directories of every repository
+    def sync(self):
+        # the directories of a repository which is being processed are changing, so keep the previous ones until it is finished
+        owners = { path : repo for path, repo in self.Owners.items() if repo.Processing }
+        for repo in self.Manager.All:
+            if not repo.Processing:
+                for path in repo.get_watched_paths():
+                    owners[path] = repo
+
+        for path in list(self.Backend.Paths):
+            if path not in owners:
+                self.Backend.remove(path)
+
+        added = []
+        try:
+            for path in owners:
+                if path not in self.Backend.Paths and self.Backend.add(path):
+                    added.append(path)
+        except OSError as e:
+            self.Manager.print('{0}, polling for file changes instead'.format(e.strerror))
+            mode = self.Mode
+            self.set_backend('poll')
+            self.Mode = mode
+            return
+
+        first = not self.Owners
+        self.Owners = owners
+        self.LastSync = time.time()
+
+        # a new directory may have changed before it was watched, so check it once more
+        if not first:
+            now = time.time()
+            for path in added:
+                self.changed(path, None, now)
+
+    def changed(self, path, name, now):
+        if path is None:
+            for repo in set(self.Owners.values()):
+                self.add_pending(repo, None, now)
+        elif path in self.Owners:
+            repo = self.Owners[path]
+
+            # only the scanned directories matter within the base directory
+            if path != repo.path['base'] or name is None or name in scanned_dirs:
+                self.add_pending(repo, path, now)
+
+    def add_pending(self, repo, path, now):
+        if not self.Pending:
+            self.First = now
+        self.Last = now
+
+        if repo not in self.Pending:
+            self.Pending[repo] = set()
+        self.Pending[repo].add(path)
+
+    def flush(self):
+        pending, self.Pending = self.Pending, {}
+        rescans = { repo : paths for repo, paths in pending.items() if not self.defer(repo, paths) }
+
+        # the rescans change the flags and files shown in the gui, so they are made on the gui thread
+        if rescans:
+            self.Manager.RescanSignal.emit(rescans)
+
+    # a repository which is being processed is scanned once it is finished, so returns True if its changes were kept until then
+    def defer(self, repo, paths):
+        with self.DeferredLock:
+            if repo.Processing:
+                self.Deferred.setdefault(repo, set()).update(paths)
+                return True
+
+        return False
+
+    # called once a repository is no longer processed, from any thread
+    def finished(self, repo):
+        with self.DeferredLock:
+            paths = self.Deferred.pop(repo, None)
+
+        if paths:
+            self.Manager.RescanSignal.emit({ repo : paths })
+
+    # sync the watched directories on the next step, only if the directories of any of the repositories changed
+    def check(self, repos):
+        owners = self.Owners
+        for repo in repos:
+            if set(repo.get_watched_paths()) != set([path for path, owner in owners.items() if owner is repo]):
+                self.LastSync = None
+                return
@@ -22,6 +22,19 @@ def copy_files(files, destination):
         shutil.copyfile(file, destination + name)
     return names
 
+def get_size(path):
+    size = 0
+    for root, dirs, files in os.walk(path):
+        for file in files:
+            try:
+                size += os.path.getsize(os.path.join(root, file))
+            except OSError:
+                pass
+    return size
+
+def format_size(size):
+    return '{0:.1f} MB'.format(size / 1024 / 1024)
+
 def is_empty(dir):
     return not os.listdir(dir)
 
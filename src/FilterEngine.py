@@ -0,0 +1,101 @@
+# Gives each game a stable position, so a set of games can be stored as the bits of an int
+# Combining sets is then a single operation over the whole int, instead of a membership check per game
+class GameIndex:
+    def __init__(self):
+        self.Games = []
+
+    def add(self, game):
+        game.Bit = 1 << len(self.Games)
+        self.Games.append(game)
+
+    def position(self, game):
+        return game.Bit.bit_length() - 1
+
+    def bits(self, games):
+        return self.from_positions([self.position(game) for game in games])
+
+    def from_positions(self, positions):
+        # set each bit in a buffer, since combining the ints one game at a time copies them every time
+        buffer = bytearray((len(self.Games) + 7) // 8)
+        for i in positions:
+            buffer[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(buffer, 'little')
+
+    # the games of the bits, in the order they were added
+    def games(self, bits):
+        games = []
+        # the binary string is read from the lowest bit, so finding each set bit is done in C
+        flags = bin(bits)[:1:-1]
+        i = flags.find('1')
+        while i >= 0:
+            games.append(self.Games[i])
+            i = flags.find('1', i + 1)
+        return games
+
+# The OR/AND/NOT algebra of the lists shown in the browser
+# Each list provides the bits of its games, and the result is recompiled from them whenever a list is added or removed,
+# so the only work per game is showing or hiding the tiles which changed
+class FilterEngine:
+    Types = ['OR', 'AND', 'NOT']
+
+    def __init__(self, index):
+        self.Index = index
+        self.reset()
+
+    def reset(self):
+        self.Lists = { type : [] for type in self.Types }
+        self.Bits = 0
+
+    def lists(self):
+        return self.Lists['OR'] + self.Lists['AND'] + self.Lists['NOT']
+
+    def has(self, list, type):
+        return list in self.Lists[type]
+
+    # returns False if the list was already of the type
+    def add(self, list, type):
+        if self.has(list, type):
+            return False
+
+        self.remove(list)
+        self.Lists[type].append(list)
+        return True
+
+    def remove(self, list, type=None):
+        for name in [type] if type else self.Types:
+            if list in self.Lists[name]:
+                self.Lists[name].remove(list)
+
+    def union(self, lists):
+        bits = 0
+        for list in lists:
+            bits |= list.getBits()
+        return bits
+
+    def intersection(self, lists):
+        bits = lists[0].getBits()
+        for list in lists[1:]:
+            bits &= list.getBits()
+        return bits
+
+    def compile(self):
+        OR, AND, NOT = [self.Lists[type] for type in self.Types]
+
+        if OR and AND:
+            bits = self.union(OR) & self.intersection(AND)
+        elif OR:
+            bits = self.union(OR)
+        elif AND:
+            bits = self.intersection(AND)
+        else:
+            bits = 0
+
+        self.Bits = bits & ~self.union(NOT)
+        return self.Bits
+
+    # the games to hide and to show, so that the shown games match the compiled result
+    def delta(self, shown):
+        return self.Index.games(shown & ~self.Bits), self.Index.games(self.Bits & ~shown)
+
+    def games(self):
+        return self.Index.games(self.Bits)
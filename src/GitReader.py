@@ -0,0 +1,437 @@
+import os, re, zlib, struct, threading
+from datetime import datetime, timezone, timedelta
+
+object_types = { 1 : 'commit', 2 : 'tree', 3 : 'blob', 4 : 'tag' }
+
+# Raised when the repository uses a layout the reader does not support, so the git command should be used instead
+class GitReaderError(Exception):
+    pass
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+def apply_delta(base, delta):
+    src_size, pos = read_varint(delta, 0)
+    dst_size, pos = read_varint(delta, pos)
+
+    if src_size != len(base):
+        raise GitReaderError('Delta base size mismatch')
+
+    output = bytearray()
+    while pos < len(delta):
+        op = delta[pos]
+        pos += 1
+
+        # copy from the base
+        if op & 0x80:
+            offset = size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            output += base[offset:offset + (size or 0x10000)]
+        # insert new data
+        elif op:
+            output += delta[pos:pos + op]
+            pos += op
+        else:
+            raise GitReaderError('Invalid delta opcode')
+
+    if len(output) != dst_size:
+        raise GitReaderError('Delta result size mismatch')
+
+    return bytes(output)
+
+def inflate(f):
+    decompressor = zlib.decompressobj()
+    output = b''
+    while not decompressor.eof:
+        chunk = f.read(4096)
+        if not chunk:
+            raise GitReaderError('Truncated pack object')
+        output += decompressor.decompress(chunk)
+    return output
+
+# A version 2 pack index, which maps each object id to its offset in the pack
+class PackIndex:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.Data = f.read()
+
+        if self.Data[:8] != b'\xfftOc\x00\x00\x00\x02':
+            raise GitReaderError('Unsupported pack index: ' + path)
+
+        self.Fanout = struct.unpack('>256I', self.Data[8:8 + 1024])
+        self.Count = self.Fanout[255]
+        self.Ids = 8 + 1024
+        self.Offsets = self.Ids + self.Count * 24
+        self.LargeOffsets = self.Offsets + self.Count * 4
+        self.Pack = path[:-4] + '.pack'
+
+    def find(self, id):
+        first = id[0]
+        low = self.Fanout[first - 1] if first else 0
+        high = self.Fanout[first]
+
+        while low < high:
+            mid = (low + high) // 2
+            start = self.Ids + mid * 20
+            current = self.Data[start:start + 20]
+
+            if current < id:
+                low = mid + 1
+            elif current > id:
+                high = mid
+            else:
+                start = self.Offsets + mid * 4
+                offset = struct.unpack('>I', self.Data[start:start + 4])[0]
+
+                # the high bit indicates an index into the table of 8-byte offsets
+                if offset & 0x80000000:
+                    start = self.LargeOffsets + (offset & 0x7fffffff) * 8
+                    offset = struct.unpack('>Q', self.Data[start:start + 8])[0]
+
+                return offset
+
+        return None
+
+# Reads the HEAD, refs, config and objects of a repository without starting a git process
+# Only the common layouts are supported, anything else raises a GitReaderError
+class GitReader:
+    # pack indexes are shared between readers, and reloaded if the file changes
+    Indexes = {}
+    Lock = threading.Lock()
+
+    def __init__(self, path):
+        self.Path = path
+        self.GitDir = self.find_git_dir(path)
+        self.CommonDir = self.GitDir
+
+        # worktrees keep their HEAD separate, but share the refs and objects of the main repository
+        commondir = os.path.join(self.GitDir, 'commondir')
+        if os.path.exists(commondir):
+            with open(commondir, 'r') as f:
+                self.CommonDir = os.path.normpath(os.path.join(self.GitDir, f.read().strip()))
+
+        self.ObjectDirs = [os.path.join(self.CommonDir, 'objects')]
+
+        alternates = os.path.join(self.CommonDir, 'objects', 'info', 'alternates')
+        if os.path.exists(alternates):
+            with open(alternates, 'r') as f:
+                for line in f.read().split('\n'):
+                    if line and not line.startswith('#'):
+                        self.ObjectDirs.append(os.path.normpath(os.path.join(self.ObjectDirs[0], line)))
+
+    def find_git_dir(self, path):
+        dotgit = os.path.join(path, '.git')
+
+        if os.path.isdir(dotgit):
+            return dotgit
+
+        if os.path.isfile(dotgit):
+            with open(dotgit, 'r') as f:
+                match = re.match(r'gitdir: (.+)', f.read().strip())
+
+            if match:
+                return os.path.normpath(os.path.join(path, match.group(1)))
+
+        raise GitReaderError('Not a git repository: ' + path)
+
+    # the name of the current branch, or 'HEAD' if detached
+    def branch(self):
+        head = self.read_file(self.GitDir, 'HEAD')
+
+        if head.startswith('ref: refs/heads/'):
+            return head[16:]
+
+        if head.startswith('ref: '):
+            raise GitReaderError('Unsupported HEAD: ' + head)
+
+        return 'HEAD'
+
+    def head(self):
+        return self.resolve('HEAD')
+
+    def resolve(self, ref, depth=0):
+        if depth > 5:
+            raise GitReaderError('Too many symbolic refs: ' + ref)
+
+        directory = self.GitDir if ref == 'HEAD' else self.CommonDir
+        value = self.read_file(directory, ref, True)
+
+        if value is None:
+            value = self.packed_refs().get(ref)
+            if value is None:
+                raise GitReaderError('Unknown ref: ' + ref)
+
+        if value.startswith('ref: '):
+            return self.resolve(value[5:], depth + 1)
+
+        if not re.match(r'^[0-9a-f]{40}$', value):
+            raise GitReaderError('Unsupported ref value: ' + value)
+
+        return value
+
+    def packed_refs(self):
+        refs = {}
+        path = os.path.join(self.CommonDir, 'packed-refs')
+
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                for line in f.read().split('\n'):
+                    # skip the header, and the peeled values of annotated tags
+                    if line and line[0] not in '#^':
+                        id, name = line.split(' ', 1)
+                        refs[name] = id
+
+        return refs
+
+    # the names of the tags which point at the commit, either directly or through an annotated tag
+    def tags(self, commit):
+        refs = {}
+        path = os.path.join(self.CommonDir, 'packed-refs')
+
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                lines = f.read().split('\n')
+
+            # without the fully-peeled trait, each packed tag would have to be read to know if it is annotated
+            if not lines[0].startswith('# pack-refs with:') or 'fully-peeled' not in lines[0].split():
+                raise GitReaderError('Unsupported packed-refs: ' + lines[0])
+
+            name = None
+            for line in lines[1:]:
+                # the commit of an annotated tag follows it
+                if line.startswith('^'):
+                    if name:
+                        refs[name] = line[1:]
+                elif line:
+                    id, name = line.split(' ', 1)
+                    if name.startswith('refs/tags/'):
+                        refs[name] = id
+                    else:
+                        name = None
+
+        # the loose tags replace the packed ones, and are peeled by reading them
+        directory = os.path.join(self.CommonDir, 'refs', 'tags')
+        for root, dirs, files in os.walk(directory):
+            for file in files:
+                name = 'refs/tags/' + os.path.relpath(os.path.join(root, file), directory).replace(os.sep, '/')
+                refs[name] = self.peel(self.read_file(root, file))
+
+        return sorted([name[10:] for name, id in refs.items() if id == commit])
+
+    # the object which the (possibly annotated) tag points to
+    def peel(self, id, depth=0):
+        if depth > 5:
+            raise GitReaderError('Too many nested tags: ' + id)
+
+        type, data = self.read_object(id)
+        if type != 'tag':
+            return id
+
+        match = re.match(rb'object ([0-9a-f]{40})', data)
+        if not match:
+            raise GitReaderError('Tag has no object: ' + id)
+
+        return self.peel(match.group(1).decode(), depth + 1)
+
+    # if the history of the repository was cut off, i.e. by a shallow clone
+    def shallow(self):
+        path = os.path.join(self.CommonDir, 'shallow')
+        return os.path.isfile(path) and os.path.getsize(path) > 0
+
+    def read_file(self, directory, name, optional=False):
+        path = os.path.join(directory, name)
+
+        if not os.path.isfile(path):
+            if optional:
+                return None
+            raise GitReaderError('Missing file: ' + path)
+
+        with open(path, 'r') as f:
+            return f.read().strip()
+
+    # the value of a 'section.subsection.key' or 'section.key' config entry, or an empty string if not set
+    # the section and key names are case-insensitive, but the subsection is not
+    def config(self, key):
+        path = os.path.join(self.CommonDir, 'config')
+        value = ''
+        section = None
+
+        parts = key.split('.')
+        target = (parts[0].lower(), '.'.join(parts[1:-1]) or None, parts[-1].lower())
+
+        if not os.path.exists(path):
+            raise GitReaderError('Missing config: ' + path)
+
+        with open(path, 'r') as f:
+            lines = f.read().split('\n')
+
+        for line in lines:
+            line = line.strip()
+            if not line or line[0] in '#;':
+                continue
+
+            match = re.match(r'^\[\s*([^\s\]"]+)(?:\s+"(.*)")?\s*\]$', line)
+            if match:
+                name = match.group(1).lower()
+                subsection = match.group(2)
+
+                # the deprecated [section.subsection] form, where the subsection is also case-insensitive
+                if subsection is None and '.' in name:
+                    name, subsection = name.split('.', 1)
+
+                section = (name, subsection)
+                continue
+
+            if line[0] == '[' or '\\' in line:
+                raise GitReaderError('Unsupported config line: ' + line)
+
+            if section and section[0] in ['include', 'includeif']:
+                raise GitReaderError('Config includes are not supported')
+
+            name, equals, entry = line.partition('=')
+            if section and section + (name.strip().lower(),) == target:
+                # the last value takes precedence, and a key without a value is a boolean which is set
+                value = self.config_value(entry) if equals else 'true'
+
+        return value
+
+    # the value without its quotes or any trailing comment, with the whitespace outside of quotes collapsed like git
+    def config_value(self, entry):
+        value = ''
+        space = False
+        quoted = False
+
+        for char in entry.strip():
+            if char == '"':
+                quoted = not quoted
+            elif quoted:
+                value += char
+                continue
+            elif char in '#;':
+                break
+            elif char.isspace():
+                space = True
+                continue
+
+            if space and value:
+                value += ' '
+            space = False
+
+            if char != '"':
+                value += char
+
+        return value
+
+    def read_object(self, id):
+        binary = bytes.fromhex(id)
+
+        for directory in self.ObjectDirs:
+            path = os.path.join(directory, id[:2], id[2:])
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    header, _, data = zlib.decompress(f.read()).partition(b'\x00')
+
+                return header.split(b' ')[0].decode(), data
+
+        for directory in self.ObjectDirs:
+            for index in self.pack_indexes(directory):
+                offset = index.find(binary)
+                if offset is not None:
+                    with open(index.Pack, 'rb') as f:
+                        return self.read_packed(f, offset)
+
+        raise GitReaderError('Object not found: ' + id)
+
+    def pack_indexes(self, directory):
+        indexes = []
+        directory = os.path.join(directory, 'pack')
+
+        if not os.path.isdir(directory):
+            return indexes
+
+        keys = []
+        for name in os.listdir(directory):
+            if name.endswith('.idx'):
+                path = os.path.join(directory, name)
+                keys.append((path, os.path.getmtime(path)))
+
+        with GitReader.Lock:
+            # drop the indexes of the packs in the directory which were removed or rewritten, i.e. after a repack
+            for stale in [stale for stale in GitReader.Indexes if os.path.dirname(stale[0]) == directory and stale not in keys]:
+                del GitReader.Indexes[stale]
+
+            for key in keys:
+                if key not in GitReader.Indexes:
+                    GitReader.Indexes[key] = PackIndex(key[0])
+                indexes.append(GitReader.Indexes[key])
+
+        return indexes
+
+    def read_packed(self, f, offset):
+        f.seek(offset)
+        byte = f.read(1)[0]
+        type = (byte >> 4) & 7
+        while byte & 0x80:
+            byte = f.read(1)[0]
+
+        if type in object_types:
+            return object_types[type], inflate(f)
+
+        # offset delta, where the base is earlier in the same pack
+        if type == 6:
+            byte = f.read(1)[0]
+            distance = byte & 0x7f
+            while byte & 0x80:
+                byte = f.read(1)[0]
+                distance = ((distance + 1) << 7) | (byte & 0x7f)
+
+            delta = inflate(f)
+            base_type, base = self.read_packed(f, offset - distance)
+            return base_type, apply_delta(base, delta)
+
+        # reference delta, where the base is identified by its id
+        if type == 7:
+            base_id = f.read(20).hex()
+            delta = inflate(f)
+            base_type, base = self.read_object(base_id)
+            return base_type, apply_delta(base, delta)
+
+        raise GitReaderError('Unsupported pack object type: ' + str(type))
+
+    # the author date of the commit, in the same format as 'git log --format=%ai'
+    def date(self, id=None):
+        id = id or self.head()
+        type, data = self.read_object(id)
+
+        if type != 'commit':
+            raise GitReaderError('Not a commit: ' + id)
+
+        for line in data.split(b'\n'):
+            if not line:
+                break
+
+            if line.startswith(b'author '):
+                match = re.search(rb'> (\d+) ([+-])(\d\d)(\d\d)$', line)
+                if not match:
+                    break
+
+                sign = 1 if match.group(2) == b'+' else -1
+                offset = timedelta(hours=int(match.group(3)), minutes=int(match.group(4))) * sign
+                date = datetime.fromtimestamp(int(match.group(1)), timezone(offset))
+                return date.strftime('%Y-%m-%d %H:%M:%S ') + (match.group(2) + match.group(3) + match.group(4)).decode()
+
+        raise GitReaderError('Commit has no author date: ' + id)
@@ -0,0 +1,149 @@
+import os, json, time, threading
+from src.Files import *
+
+# One bare repository per upstream basis, which holds the objects of every fork that is cloned from it
+# Forks are cloned with '--reference', so only the objects which are not in the store are kept in the fork itself
+# The store is never pruned, since the forks depend on its objects through their alternates
+class ObjectStore:
+    def __init__(self, manager, path):
+        self.Manager = manager
+        self.Path = path
+        self.StatsPath = path + 'stats.json'
+        self.Locks = {}
+        self.Lock = threading.Lock()
+        self.Stats = read_json(self.StatsPath) if os.path.exists(self.StatsPath) else {}
+        self.Updated = []
+        self.Bases = None
+
+    # the upstream basis name of the repository (i.e. pret/pokered), or None if it doesnt share a basis with any other
+    def getBasis(self, repo):
+        if self.Bases is None:
+            self.Bases = set([self.getRoot(game) for game in self.Manager.All if 'basis' in game.Data])
+
+        root = self.getRoot(repo)
+        return root if root in self.Bases else None
+
+    # follow the basis of each fork until reaching one without a basis
+    def getRoot(self, repo):
+        name = repo.author + '/' + repo.title
+        visited = [name]
+
+        while 'basis' in repo.Data:
+            name = repo.Data['basis']
+            if name in visited:
+                break
+
+            visited.append(name)
+            [author, title] = name.split('/')
+            author = self.Manager.Catalogs.Authors.get(author)
+
+            if not author or title not in author.GameStructure:
+                break
+
+            repo = author.getGame(title)
+
+        return name
+
+    def getLock(self, basis):
+        with self.Lock:
+            if basis not in self.Locks:
+                self.Locks[basis] = threading.Lock()
+
+            return self.Locks[basis]
+
+    # fetch the objects of the repository into the store of its basis
+    # returns the path to reference when cloning and how long the fetch took, or None if not shared
+    def prepare(self, repo):
+        basis = self.getBasis(repo)
+        if not basis:
+            return None, 0
+
+        path = self.Path + basis + '.git'
+        git = repo.git
+
+        with self.getLock(basis):
+            if not os.path.exists(path):
+                repo.print('Creating shared object store for ' + basis)
+                mkdir(path)
+
+                if git.run('init --bare', Directory=path).returncode:
+                    rmdir(path)
+                    return None, 0
+
+                # keep every object, and dont let git collect the store automatically
+                for key, value in [('gc.auto', '0'), ('gc.pruneExpire', 'never'), ('gc.reflogExpire', 'never'), ('gc.reflogExpireUnreachable', 'never')]:
+                    git.run('config', key, value, Directory=path)
+
+            repo.print('Fetching into shared object store for ' + basis)
+            namespace = 'refs/forks/' + repo.author + '/' + repo.title
+
+            start = time.time()
+            result = git.run('fetch --no-tags', repo.url, '"+refs/heads/*:{0}/heads/*"'.format(namespace), '"+refs/tags/*:{0}/tags/*"'.format(namespace), Directory=path)
+            elapsed = time.time() - start
+
+        if result.returncode:
+            repo.print('Failed to fetch into shared object store')
+            return None, 0
+
+        return path, elapsed
+
+    def clone(self, repo, *args):
+        path, fetchTime = self.prepare(repo)
+
+        if not path:
+            return repo.git.clone(*args)
+
+        start = time.time()
+        result = repo.git.clone('--reference "{0}"'.format(repo.git.path(os.path.abspath(path))), *args)
+
+        if not result.returncode:
+            self.record(repo, self.getBasis(repo), path, fetchTime, time.time() - start)
+
+        return result
+
+    def record(self, repo, basis, path, fetchTime, cloneTime):
+        size = get_size(repo.path['repo'] + '/.git/objects')
+        shared = get_size(path + '/objects')
+
+        with self.Lock:
+            if basis not in self.Stats:
+                self.Stats[basis] = {}
+
+            self.Stats[basis][repo.author + '/' + repo.title] = {
+                'fetch' : fetchTime,
+                'clone' : cloneTime,
+                'size' : size
+            }
+
+            if basis not in self.Updated:
+                self.Updated.append(basis)
+
+        repo.print('Cloned with shared objects of {0} in {1:.1f}s ({2} local, {3} shared)'.format(basis, fetchTime + cloneTime, format_size(size), format_size(shared)))
+
+    # print the disk and clone time savings of each basis which was used since the last report, and save the stats
+    def report(self):
+        with self.Lock:
+            bases, self.Updated = self.Updated, []
+
+            for basis in bases:
+                repos = self.Stats[basis]
+                shared = get_size(self.Path + basis + '.git/objects')
+                local = sum(data['size'] for data in repos.values())
+
+                # the first fetch downloads the whole basis, so it approximates the time of a regular clone
+                times = sorted(data['fetch'] + data['clone'] for data in repos.values())
+                full = max(times)
+
+                self.Manager.print('Shared objects of {0}: {1} repositories use {2} on disk instead of ~{3}, and took {4:.1f}s to clone instead of ~{5:.1f}s'.format(
+                    basis,
+                    len(repos),
+                    format_size(shared + local),
+                    format_size(shared * len(repos) + local),
+                    sum(times),
+                    full * len(repos)
+                ))
+
+            if bases:
+                mkdir(self.Path)
+                with open(self.StatsPath, 'w') as f:
+                    f.write(json.dumps(self.Stats, indent=4))
@@ -0,0 +1,102 @@
+import os, asyncio, platform, shlex, subprocess
+
+def unquote(arg):
+    if len(arg) > 1 and arg[0] == arg[-1] == '"':
+        return arg[1:-1]
+
+    return arg
+
+class RefreshEngine:
+    def __init__(self, manager, limit):
+        self.Manager = manager
+        self.Limit = max(1, limit)
+
+    # Query the remote heads, tags and releases of all repositories concurrently
+    # The handler is called with each repository and its results as soon as they are available
+    def run(self, repos, handler):
+        asyncio.run(self.refresh_all(repos, handler))
+
+    async def refresh_all(self, repos, handler):
+        self.Semaphore = asyncio.Semaphore(self.Limit)
+        await asyncio.gather(*[self.refresh(repo, handler) for repo in repos])
+
+    async def refresh(self, repo, handler):
+        if self.Manager.Cancelled:
+            return
+
+        heads, tags, releases = await asyncio.gather(
+            self.cached(repo, 'head', self.list(repo, 'head')),
+            self.cached(repo, 'tags', self.list(repo, 'tags')),
+            self.cached(repo, 'releases', self.query(repo.github, 'release list -R {0}'.format(repo.url)))
+        )
+
+        # the handler writes the metadata and files of the repository, so it runs on a thread instead of blocking the other queries
+        await asyncio.get_running_loop().run_in_executor(None, handler, repo, {
+            'head' : heads,
+            'tags' : tags,
+            'releases' : releases
+        })
+
+    # Use the cached listing if available, otherwise run the query and store its result
+    async def cached(self, repo, which, query):
+        entry = self.Manager.RemoteCache.get(repo.url, which)
+
+        if entry:
+            query.close()
+            rows, age = entry
+            repo.print('Using cached remote {0} ({1}s old)'.format(which, age))
+            return rows
+
+        rows = await query
+        self.Manager.RemoteCache.set(repo.url, which, rows)
+        return rows
+
+    def list(self, repo, which):
+        if not os.path.exists(repo.path['repo']):
+            return self.query(repo.git, 'ls-remote --' + which, repo.url, Directory='.')
+
+        return self.query(repo.git, 'ls-remote --' + which)
+
+    async def query(self, command, *args, **kwargs):
+        async with self.Semaphore:
+            # dont start any new queries once the process has been terminated
+            if self.Manager.Cancelled:
+                return []
+
+            environment, program, options = command.prepare(*args, **kwargs)
+            input = options.get('input', '')
+            parameters = {}
+
+            if platform.system() == 'Windows':
+                parameters['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+                # the windows split keeps the quotes, which are added again when the command line is built
+                program = [unquote(arg) for arg in shlex.split(program, posix=False)]
+            else:
+                parameters['start_new_session'] = True
+                program = shlex.split(program)
+
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *program,
+                    stdin=subprocess.PIPE if input else subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    cwd=options['cwd'],
+                    **parameters
+                )
+            except OSError:
+                self.Manager.print('Error executing ' + environment.Name + ' Environment')
+                return []
+
+            self.Manager.addProcess(process)
+
+            try:
+                output, err = await asyncio.wait_for(process.communicate(input.encode(options['encoding']) if input else None), options['timeout'])
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                self.Manager.print('Timed out after {0} seconds: {1}'.format(options['timeout'], ' '.join(args)))
+                return []
+            finally:
+                self.Manager.removeProcess(process)
+
+            return output.decode(options['encoding']).split('\n')
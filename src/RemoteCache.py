@@ -0,0 +1,69 @@
+import os, json, time, threading, atexit
+from src.Files import *
+
+class RemoteCache:
+    def __init__(self, manager, path):
+        self.Manager = manager
+        self.Path = path
+        self.Lock = threading.Lock()
+        self.Modified = False
+        self.Data = read_json(path) if os.path.exists(path) else {}
+
+        atexit.register(self.save)
+
+    def getTTL(self):
+        return self.Manager.Settings.get('Processing.RemoteCacheTTL')
+
+    # Returns the cached rows and their age, or None if missing, expired, or bypassed
+    def get(self, url, which):
+        ttl = self.getTTL()
+
+        if self.Manager.ForceRefresh or ttl <= 0:
+            return None
+
+        with self.Lock:
+            entry = self.Data.get(url, {}).get(which)
+
+        if entry:
+            age = int(time.time() - entry['time'])
+            if age < ttl:
+                return entry['rows'], age
+
+        return None
+
+    def set(self, url, which, rows):
+        # an empty listing can also mean the query failed, so dont cache it
+        if not any(rows):
+            return
+
+        with self.Lock:
+            if url not in self.Data:
+                self.Data[url] = {}
+
+            self.Data[url][which] = {
+                'time' : time.time(),
+                'rows' : rows
+            }
+            self.Modified = True
+
+    # Returns the cached rows if available, otherwise queries the remote with the handler and stores the result
+    def fetch(self, owner, url, which, handler):
+        entry = self.get(url, which)
+
+        if entry:
+            rows, age = entry
+            owner.print('Using cached remote {0} ({1}s old)'.format(which, age))
+            return rows
+
+        rows = list(handler())
+        self.set(url, which, rows)
+        return rows
+
+    def save(self):
+        with self.Lock:
+            if self.Modified:
+                mkdir(dir_only(self.Path))
+                with open(self.Path, 'w') as f:
+                    f.write(json.dumps(self.Data))
+
+                self.Modified = False
@@ -0,0 +1,97 @@
+import threading
+
+# An n-gram index of the searchable text of each game
+# Each piece of up to three characters maps to the bits of the games containing it, so a short search term is
+# looked up directly, and a longer one only checks the text of the games which contain every one of its trigrams
+class SearchIndex:
+    def __init__(self, index):
+        self.Index = index
+        self.Text = {}
+        self.Grams = {}
+        self.Pending = set()
+        # the searches can run on another thread
+        self.Lock = threading.RLock()
+
+    # every piece of the text with up to three characters
+    def grams(self, text):
+        return set([text[i:i+n] for n in range(1, 4) for i in range(len(text) - n + 1)])
+
+    # the games are only indexed once the first search is made
+    def add(self, *games):
+        with self.Lock:
+            self.Pending.update(games)
+
+    def build(self):
+        with self.Lock:
+            if self.Pending:
+                self.index(self.Pending)
+                self.Pending = set()
+
+    def index(self, games):
+        # collect the positions of each piece first, so the bits of each piece are combined once
+        found = {}
+        for game in games:
+            text = game.get_search_text()
+            self.Text[game] = text
+            position = self.Index.position(game)
+
+            for gram in self.grams(text):
+                if gram in found:
+                    found[gram].append(position)
+                else:
+                    found[gram] = [position]
+
+        for gram, positions in found.items():
+            self.Grams[gram] = self.Grams.get(gram, 0) | self.Index.from_positions(positions)
+
+    def remove(self, game):
+        with self.Lock:
+            self.Pending.discard(game)
+            text = self.Text.pop(game, None)
+
+            if text is not None:
+                self.removeGrams(game, self.grams(text))
+
+    def removeGrams(self, game, grams):
+        for gram in grams:
+            bits = self.Grams[gram] & ~game.Bit
+            if bits:
+                self.Grams[gram] = bits
+            else:
+                del self.Grams[gram]
+
+    # index the game again, after any of its searchable text changed
+    # only the pieces which were added or removed change, and a pending game is indexed with its new text anyways
+    def update(self, game):
+        with self.Lock:
+            if game not in self.Text:
+                self.Pending.add(game)
+                return
+
+            old = self.grams(self.Text[game])
+            text = game.get_search_text()
+            new = self.grams(text)
+            self.Text[game] = text
+
+            self.removeGrams(game, old - new)
+            for gram in new - old:
+                self.Grams[gram] = self.Grams.get(gram, 0) | game.Bit
+
+    # returns the bits of the games within the given bits whose text contains the lowercase term
+    def search(self, term, bits):
+        with self.Lock:
+            self.build()
+
+            if not term:
+                return bits
+
+            if len(term) <= 3:
+                return bits & self.Grams.get(term, 0)
+
+            for i in range(len(term) - 2):
+                bits &= self.Grams.get(term[i:i+3], 0)
+                if not bits:
+                    return 0
+
+            # the trigrams can be found in any order, so each candidate is still checked
+            return self.Index.bits([game for game in self.Index.games(bits) if term in self.Text[game]])
@@ -0,0 +1,175 @@
+import sys, subprocess, platform, threading, time, uuid, atexit
+
+# Raised when a session cannot be started or stops responding, so the command should run in its own process instead
+class ShellSessionError(Exception):
+    def __init__(self, msg, started=True):
+        super().__init__(msg)
+        self.Started = started
+
+class ShellResult:
+    def __init__(self, returncode):
+        self.returncode = returncode
+
+# A long-lived shell which runs one command at a time
+# Each command runs in a subshell, and its output is followed by a marker line with the exit code
+class ShellSession:
+    def __init__(self, app, encoding):
+        self.Marker = '__pret_manager_' + uuid.uuid4().hex + '__'
+        self.Encoding = encoding
+
+        parameters = {}
+        if platform.system() == 'Windows':
+            parameters['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            parameters['start_new_session'] = True
+
+        start = time.perf_counter()
+
+        try:
+            self.Process = subprocess.Popen(app, stdin=subprocess.PIPE, stdout=subprocess.PIPE, encoding=encoding, errors='replace', bufsize=1, **parameters)
+        except (OSError, ValueError):
+            raise ShellSessionError('Could not start ' + str(app), False)
+
+        # wait until the shell is ready, so the startup time can be measured
+        self.Process.stdin.write('printf "%s %d\\n" "{0}" 0\n'.format(self.Marker))
+        self.Process.stdin.flush()
+        self.read()
+
+        self.SpawnTime = time.perf_counter() - start
+
+    def isAlive(self):
+        return self.Process.poll() is None
+
+    def run(self, script, cwd, capture, log):
+        redirect = ' 2>&1' if log else ''
+
+        try:
+            self.Process.stdin.write('(\ncd "{0}" || exit 1\n{1}\n) </dev/null{2}\nprintf "%s %d\\n" "{3}" "$?"\n'.format(cwd, script, redirect, self.Marker))
+            self.Process.stdin.flush()
+        except (OSError, ValueError):
+            raise ShellSessionError('Session is not running', False)
+
+        return self.read(capture, log)
+
+    # returns the output and exit code of the current command
+    def read(self, capture=True, log=None):
+        output = []
+
+        for line in self.Process.stdout:
+            index = line.find(self.Marker)
+
+            if index >= 0:
+                # the output might not end with a new line
+                if index:
+                    self.handle(line[:index], output, capture, log)
+
+                return ''.join(output), int(line[index + len(self.Marker):])
+
+            self.handle(line, output, capture, log)
+
+        self.close()
+        raise ShellSessionError('Session stopped responding')
+
+    def handle(self, line, output, capture, log):
+        if log:
+            log(line.rstrip('\n'))
+        elif capture:
+            output.append(line)
+        else:
+            sys.stdout.write(line)
+
+    def close(self):
+        if self.isAlive():
+            try:
+                self.Process.stdin.close()
+            except OSError:
+                pass
+
+            try:
+                self.Process.wait(1)
+            except subprocess.TimeoutExpired:
+                self.Process.kill()
+                self.Process.wait()
+
+# The idle shell sessions of an environment, which are reused by each command
+class ShellSessionPool:
+    def __init__(self, environment):
+        self.Environment = environment
+        self.Idle = []
+        self.Lock = threading.Lock()
+        self.Spawns = 0
+        self.SpawnTime = 0
+        self.Commands = 0
+
+        atexit.register(self.close)
+
+    # returns an idle session which decodes its output with the encoding, or a new one
+    def acquire(self, app, encoding):
+        with self.Lock:
+            for session in reversed(self.Idle[:]):
+                if not session.isAlive():
+                    self.Idle.remove(session)
+                elif session.Encoding == encoding:
+                    self.Idle.remove(session)
+                    return session
+
+        session = ShellSession(app, encoding)
+
+        with self.Lock:
+            self.Spawns += 1
+            self.SpawnTime += session.SpawnTime
+
+        return session
+
+    def release(self, session):
+        with self.Lock:
+            if session.isAlive():
+                self.Idle.append(session)
+
+    def run(self, app, options):
+        manager = self.Environment.Environments.Manager
+        cwd = self.Environment.path(options['cwd'])
+        capture = options.get('capture_output')
+        log = options.get('log')
+
+        # if the session closed before the command was sent, retry once with a new session
+        for attempt in range(2):
+            session = self.acquire(app, options.get('encoding') or 'utf-8')
+            manager.addProcess(session.Process)
+
+            try:
+                output, returncode = session.run(options.get('input', ''), cwd, capture, log)
+                break
+            except KeyboardInterrupt:
+                self.Environment.kill(session.Process)
+                raise
+            except ShellSessionError as e:
+                self.Environment.kill(session.Process)
+                output, returncode = '', 1
+
+                if e.Started:
+                    break
+            finally:
+                manager.removeProcess(session.Process)
+
+        self.release(session)
+
+        with self.Lock:
+            self.Commands += 1
+
+        return output.split('\n') if capture else ShellResult(returncode)
+
+    # the number of shells started and commands run since the last call, and the estimated time saved by reusing the shells
+    def getStats(self):
+        with self.Lock:
+            average = self.SpawnTime / self.Spawns if self.Spawns else 0
+            stats = self.Spawns, self.Commands, max(0, self.Commands - self.Spawns) * average
+            self.Spawns = self.Commands = self.SpawnTime = 0
+            return stats
+
+    def close(self):
+        with self.Lock:
+            sessions, self.Idle = self.Idle, []
+
+        for session in sessions:
+            session.close()
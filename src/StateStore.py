@@ -0,0 +1,113 @@
+import os, json, sqlite3, threading
+from contextlib import contextmanager
+from src.Files import *
+
+# Stores the metadata of the manager and each repository in a single SQLite database
+# Each property is stored as its own row of JSON, keyed by the base directory of its owner
+class StateStore:
+    Version = 1
+
+    def __init__(self, manager, path, directories):
+        self.Manager = manager
+        self.Path = path
+        self.Lock = threading.RLock()
+        self.Depth = 0
+
+        mkdir(dir_only(path))
+        self.Connection = sqlite3.connect(path, check_same_thread=False)
+        self.Connection.execute('CREATE TABLE IF NOT EXISTS metadata (owner TEXT, property TEXT, value TEXT, PRIMARY KEY (owner, property))')
+
+        if self.Connection.execute('PRAGMA user_version').fetchone()[0] < StateStore.Version:
+            self.migrate(directories)
+
+        # read everything at once, instead of once per repository
+        self.Data = {}
+        for owner, property, value in self.Connection.execute('SELECT owner, property, value FROM metadata'):
+            if owner not in self.Data:
+                self.Data[owner] = {}
+            self.Data[owner][property] = value
+
+    # import the existing metadata.json files
+    # each directory is given with the depth of its deepest owners, so the contents of the repositories are not searched
+    def migrate(self, directories):
+        count = 0
+
+        with self.Lock, self.Connection:
+            for directory, depth in directories:
+                for root, dirs, files in os.walk(directory):
+                    relative = os.path.relpath(root, directory)
+                    if (0 if relative == '.' else relative.count(os.sep) + 1) >= depth:
+                        dirs[:] = []
+
+                    if 'metadata.json' in files:
+                        owner = clean_path(root + '/')
+                        data = read_json(owner + 'metadata.json')
+
+                        self.Connection.executemany('INSERT OR REPLACE INTO metadata VALUES (?, ?, ?)', [(owner, key, json.dumps(value)) for key, value in data.items()])
+                        count += 1
+
+            self.Connection.execute('PRAGMA user_version = {0}'.format(StateStore.Version))
+
+        if count:
+            self.Manager.print('Migrated the metadata of {0} repositories to {1}'.format(count, self.Path))
+
+    # returns the stored properties of the owner, or None if it has none
+    def get(self, owner):
+        with self.Lock:
+            if owner not in self.Data:
+                return None
+
+            return { key : json.loads(value) for key, value in self.Data[owner].items() }
+
+    # returns the stored JSON of a single property, or an empty string if it is not stored
+    def get_raw(self, owner, property):
+        with self.Lock:
+            return self.Data.get(owner, {}).get(property, '')
+
+    # returns the stored JSON of every property of the owner
+    def get_all_raw(self, owner):
+        with self.Lock:
+            return dict(self.Data.get(owner, {}))
+
+    def set(self, owner, changed, removed):
+        with self.Lock:
+            if owner not in self.Data:
+                self.Data[owner] = {}
+
+            rows = [(owner, key, json.dumps(value)) for key, value in changed.items()]
+            for row in rows:
+                self.Data[owner][row[1]] = row[2]
+
+            for key in removed:
+                self.Data[owner].pop(key, None)
+
+            self.Connection.executemany('INSERT OR REPLACE INTO metadata VALUES (?, ?, ?)', rows)
+            self.Connection.executemany('DELETE FROM metadata WHERE owner = ? AND property = ?', [(owner, key) for key in removed])
+
+            if not self.Depth:
+                self.Connection.commit()
+
+    # commit all of the changes made within the block in a single transaction
+    @contextmanager
+    def batch(self):
+        with self.Lock:
+            self.Depth += 1
+            try:
+                yield
+            finally:
+                self.Depth -= 1
+                if not self.Depth:
+                    self.Connection.commit()
+
+    # write the metadata.json file of each owner, for compatibility with older versions
+    def export(self):
+        with self.Lock:
+            owners = list(self.Data)
+
+        for owner in owners:
+            data = self.get(owner)
+            mkdir(owner)
+            with open(owner + 'metadata.json', 'w') as f:
+                f.write(json.dumps(data, indent=4))
+
+        self.Manager.print('Exported the metadata of {0} repositories'.format(len(owners)))
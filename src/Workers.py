@@ -0,0 +1,202 @@
+import threading, traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Keeps the log lines of each repository together, in the order of the queue
+# The first unfinished repository logs directly, while the others are buffered until it is their turn
+class OrderedLog:
+    def __init__(self, repos):
+        self.Order = list(repos)
+        self.Buffers = { repo : [] for repo in self.Order }
+        self.Lock = threading.RLock()
+        # the lines ready to be output, which are output after the lock is released since the output can block
+        self.Ready = deque()
+        self.Flushing = False
+
+        for repo in self.Order:
+            repo.Log = self
+
+    def write(self, repo, msg):
+        with self.Lock:
+            if self.Order and self.Order[0] is repo:
+                self.Ready.append((repo, msg))
+            else:
+                self.Buffers[repo].append(msg)
+
+        self.flush()
+
+    def finish(self, repo):
+        with self.Lock:
+            self.Buffers[repo].append(None)
+
+            # release each finished repository, and flush the buffer of the next one
+            while self.Order:
+                head = self.Order[0]
+                lines = self.Buffers[head]
+
+                while lines:
+                    msg = lines.pop(0)
+                    if msg is None:
+                        break
+                    self.Ready.append((head, msg))
+                else:
+                    # the head has not finished yet
+                    break
+
+                self.Order.pop(0)
+                del self.Buffers[head]
+                head.Log = None
+
+        self.flush()
+
+    # output the ready lines in order, from one thread at a time
+    def flush(self):
+        with self.Lock:
+            if self.Flushing:
+                return
+            self.Flushing = True
+
+        try:
+            while True:
+                with self.Lock:
+                    if not self.Ready:
+                        self.Flushing = False
+                        return
+                    repo, msg = self.Ready.popleft()
+
+                repo.output(msg)
+        except:
+            with self.Lock:
+                self.Flushing = False
+            raise
+
+    # flush anything remaining (i.e. if the process was terminated)
+    def close(self):
+        with self.Lock:
+            for repo in self.Order:
+                for msg in self.Buffers[repo]:
+                    if msg is not None:
+                        self.Ready.append((repo, msg))
+                repo.Log = None
+
+            self.Order = []
+            self.Buffers = {}
+
+        self.flush()
+
+class WorkerPool:
+    def __init__(self, manager, jobs):
+        self.Manager = manager
+        self.Jobs = max(1, jobs)
+        self.Active = []
+        self.Lock = threading.Lock()
+        self.Log = None
+
+    # Run the handler on each repository, at most 'Jobs' at once
+    # All commands for a single repository remain serialized within its own job
+    def run(self, repos, handler):
+        if self.Jobs == 1:
+            for repo in repos:
+                self.start(repo, handler)
+        else:
+            self.Log = OrderedLog(repos)
+            try:
+                with ThreadPoolExecutor(max_workers=self.Jobs, thread_name_prefix='pret_manager') as executor:
+                    for repo in repos:
+                        executor.submit(self.start, repo, handler)
+            finally:
+                self.Log.close()
+
+    def start(self, repo, handler):
+        try:
+            # skip any repositories which have not started yet if the process was terminated
+            if self.Manager.Cancelled:
+                return
+
+            with self.Lock:
+                self.Active.append(repo)
+
+            try:
+                handler(repo)
+            except Exception:
+                repo.print('Processing Failed:\n' + traceback.format_exc())
+                repo.setProcessing(False)
+            finally:
+                with self.Lock:
+                    self.Active.remove(repo)
+        finally:
+            if self.Log:
+                self.Log.finish(repo)
+
+    # Run each repository through a sequence of stages, each with its own pool of workers
+    # Stages are a list of (jobs, handler), and a handler can return False to skip the remaining stages
+    # A repository moves to the next stage as soon as it finishes the previous one
+    # The finish handler is called once for each started repository, however its stages ended (i.e. if cancelled)
+    def pipeline(self, repos, stages, finish=None):
+        self.Log = OrderedLog(repos)
+        self.Finish = finish
+        self.Pending = len(repos)
+        self.Done = threading.Condition()
+        self.Executors = [ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix='pret_manager') for jobs, handler in stages]
+
+        try:
+            for repo in repos:
+                self.Executors[0].submit(self.stage, repo, stages, 0)
+
+            with self.Done:
+                self.Done.wait_for(lambda: not self.Pending)
+        finally:
+            for executor in self.Executors:
+                executor.shutdown()
+
+            self.Log.close()
+
+    def stage(self, repo, stages, index):
+        isFinished = True
+        try:
+            if self.Manager.Cancelled:
+                return
+
+            if not index:
+                with self.Lock:
+                    self.Active.append(repo)
+
+            try:
+                result = stages[index][1](repo)
+            except Exception:
+                repo.print('Processing Failed:\n' + traceback.format_exc())
+                repo.setProcessing(False)
+                result = False
+
+            if result is not False and index + 1 < len(stages) and not self.Manager.Cancelled:
+                try:
+                    self.Executors[index + 1].submit(self.stage, repo, stages, index + 1)
+                    isFinished = False
+                except RuntimeError:
+                    # the pipeline is shutting down
+                    pass
+        finally:
+            if isFinished:
+                with self.Lock:
+                    isStarted = repo in self.Active
+
+                try:
+                    if isStarted and self.Finish:
+                        self.Finish(repo)
+                except Exception:
+                    repo.print('Processing Failed:\n' + traceback.format_exc())
+                    repo.setProcessing(False)
+                finally:
+                    with self.Lock:
+                        if repo in self.Active:
+                            self.Active.remove(repo)
+
+                    self.Log.finish(repo)
+
+                with self.Done:
+                    self.Pending -= 1
+                    self.Done.notify_all()
+
+    def getActive(self):
+        with self.Lock:
+            return self.Active[:]
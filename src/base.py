@@ -1,9 +1,11 @@
 import time, json, copy, os, math
+from contextlib import contextmanager
 
 from src.qt.qt import *
 from src.Files import *
 from src.menus import *
 from src.core.functions import *
+from src.core.structures import TrackedDict, TrackedProperty, OrderedSet
 
 OfficialTags = ['red','green','blue','yellow','gold','silver','crystal','spaceworld','tcg1','tcg2','official','binary','disasm','vc-patch','analogue','debug','extras']
 
@@ -12,14 +14,18 @@ class MetaData(Emitter):
         super().__init__()
         self.MetaData = {}
         self.MetaDataProperties = properties
+        self.MetaDataModified = set()
+        self.MetaDataCoalescing = 0
+        self.MetaDataPending = False
         self.Initialized = False
 
-    def readMetaData(self, autoSetOutdated=True):
-        path = self.path['base'] + 'metadata.json'
-        if os.path.exists(path):
-            with open(path, 'r') as f:
-                data = json.loads(f.read() or '{}')
+    # called by tracked properties whenever they are modified
+    def markMetaData(self, name):
+        self.MetaDataModified.add(name)
 
+    def readMetaData(self, autoSetOutdated=True):
+        data = self.Manager.StateStore.get(self.path['base'])
+        if data is not None:
             self.MetaData = {}
             for prop in self.MetaDataProperties:
                 if prop in data:
@@ -30,6 +36,9 @@ class MetaData(Emitter):
         for prop in self.MetaDataProperties:
             self.getMetaDataProperty(prop)
 
+        # the values were just read, so they are not modified
+        self.MetaDataModified.clear()
+
     def getMetaDataProperty(self, name):
         if name in self.MetaData:
             value = copy.deepcopy(self.MetaData[name])
@@ -38,27 +47,53 @@ class MetaData(Emitter):
             else:
                 setattr(self, name, value)
 
+    # defer any metadata updates within the block, and write them once at the end
+    @contextmanager
+    def coalesceMetaData(self):
+        self.MetaDataCoalescing += 1
+        try:
+            yield
+        finally:
+            self.MetaDataCoalescing -= 1
+
+            if not self.MetaDataCoalescing and self.MetaDataPending:
+                self.MetaDataPending = False
+                self.updateMetaData()
+
     def updateMetaData(self):
+        if self.MetaDataCoalescing:
+            self.MetaDataPending = True
+            return
+
         # dont update meta data if triggered during initialization
         # (since some parameters are not assigned properly yet)
         if self.Initialized:
-            metadataChanged = [self.updateMetaDataProperty(prop) for prop in self.MetaDataProperties]
+            changed = [prop for prop in self.MetaDataProperties if self.updateMetaDataProperty(prop)]
 
-            if any(metadataChanged):
-                mkdir(self.path['base'])
-                with open(self.path['base'] + 'metadata.json', 'w') as f:
-                    f.write(json.dumps(self.MetaData, indent=4))
+            if changed:
+                self.Manager.StateStore.set(
+                    self.path['base'],
+                    { prop : self.MetaData[prop] for prop in changed if prop in self.MetaData },
+                    [prop for prop in changed if prop not in self.MetaData]
+                )
 
     def updateMetaDataProperty(self, name):
-        value = copy.deepcopy( getattr(self, name) )
+        value = getattr(self, name)
+
+        # tracked properties only need to be compared if they were modified
+        if isinstance(value, TrackedDict):
+            if name not in self.MetaDataModified and name in self.MetaData:
+                return False
+
+            self.MetaDataModified.discard(name)
 
         if name not in self.MetaData:
-            self.MetaData[name] = value
+            self.MetaData[name] = copy.deepcopy(value)
             return True
 
         if value != self.MetaData[name]:
             if value:
-                self.MetaData[name] = value
+                self.MetaData[name] = copy.deepcopy(value)
                 return True
             elif name in self.MetaData:
                 del self.MetaData[name]
@@ -1,17 +1,28 @@
 from src.base import *
 
 class SearchBox(LineEdit):
+    ResultSignal = pyqtSignal(str, object, float)
+
     def __init__(self, searchList):
         super().__init__()
         self.Mode = "And"
         self.setPlaceholderText("Search")
         self.SearchList = searchList
         self.textChanged.connect(self.SearchList.onTextChanged)
+
+        # restarted by each keystroke, so the search only starts once typing pauses
+        self.Timer = QTimer()
+        self.Timer.setSingleShot(True)
+        self.Timer.timeout.connect(self.SearchList.startSearch)
+        self.ResultSignal.connect(self.SearchList.onResult)
         searchList.Manager.GUI.Content.Catalogs.Header.SearchContainer.add(self)
 
     def getData(self):
         return self.SearchList.GameList[:]
 
+    def getBits(self):
+        return self.SearchList.Bits
+
 class CatalogEntryContextMenu(ContextMenu):
     def __init__(self, parent, event):
         super().__init__(parent, event)
@@ -59,6 +70,9 @@ class CatalogEntryGUI(HBox):
     def getData(self):
         return self.Data.GameList[:]
 
+    def getBits(self):
+        return self.Data.Bits
+
     def setMode(self, mode):
         self.Mode = mode
         self.setProperty("mode",mode)
@@ -0,0 +1,124 @@
+import copy
+
+# A dict which calls the handler whenever it, or any dict inside of it, is modified
+# (lists inside of it are not tracked, so they should be replaced rather than modified)
+class TrackedDict(dict):
+    def __init__(self, data, handler):
+        super().__init__()
+        self.Handler = handler
+
+        for key, value in data.items():
+            dict.__setitem__(self, key, self.track(value))
+
+    def track(self, value):
+        if isinstance(value, dict) and not (isinstance(value, TrackedDict) and value.Handler is self.Handler):
+            return TrackedDict(value, self.Handler)
+
+        return value
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, self.track(value))
+        self.Handler()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self.Handler()
+
+    def pop(self, key, *default):
+        if key in self:
+            self.Handler()
+
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self.Handler()
+        return item
+
+    def clear(self):
+        dict.clear(self)
+        self.Handler()
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            dict.__setitem__(self, key, self.track(value))
+        self.Handler()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+
+        return dict.__getitem__(self, key)
+
+    # copies are plain dicts, which are not tracked
+    def __deepcopy__(self, memo):
+        return { key : copy.deepcopy(value, memo) for key, value in self.items() }
+
+    def __reduce__(self):
+        return (dict, (self.__deepcopy__({}),))
+
+# An attribute whose dict value is tracked, so the owner is marked as modified whenever it changes
+class TrackedProperty:
+    def __init__(self, name):
+        self.Name = name
+
+    def __get__(self, obj, type=None):
+        if obj is None:
+            return self
+
+        try:
+            return obj.__dict__[self.Name]
+        except KeyError:
+            raise AttributeError(self.Name)
+
+    def __set__(self, obj, value):
+        handler = lambda: obj.markMetaData(self.Name)
+
+        if isinstance(value, dict):
+            value = TrackedDict(value, handler)
+
+        obj.__dict__[self.Name] = value
+        handler()
+
+# A set which keeps its items in the order they were added, so it can replace a list whose items are unique
+# Membership, adding and removing are constant time, instead of searching the whole list
+class OrderedSet:
+    def __init__(self, items=()):
+        self.Items = dict.fromkeys(items)
+
+    def __contains__(self, item):
+        return item in self.Items
+
+    def __iter__(self):
+        return iter(self.Items)
+
+    def __len__(self):
+        return len(self.Items)
+
+    def __bool__(self):
+        return bool(self.Items)
+
+    # indexing and slicing copy the items to a list first, like a list they return a new list for a slice
+    def __getitem__(self, index):
+        return list(self.Items)[index]
+
+    def __repr__(self):
+        return 'OrderedSet({0})'.format(list(self.Items))
+
+    def add(self, item):
+        self.Items[item] = None
+
+    def update(self, items):
+        self.Items.update(dict.fromkeys(items))
+
+    def discard(self, item):
+        self.Items.pop(item, None)
+
+    def remove(self, item):
+        del self.Items[item]
+
+    def clear(self):
+        self.Items.clear()
+
+    def copy(self):
+        return OrderedSet(self.Items)
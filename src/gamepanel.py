@@ -461,7 +461,7 @@ class BuildsTree(GameTree):
 
 class PatchesTree(GameTree):
     def __init__(self, parent):
-        super().__init__(parent, ['Outdated'], 'Patches', OtherTreeDelegate, {
+        super().__init__(parent, ['Outdated','Release'], 'Patches', OtherTreeDelegate, {
             'Patch' : PatchContextMenu
         })
 
@@ -18,20 +18,22 @@ class CartridgePixmap(Scaled):
 # todo - skipping green for now
 games = ['red', 'blue', 'yellow', 'gold', 'silver', 'crystal', 'tcg1', 'tcg2']
 
+def getCartridgeColor(game):
+    color = ''
+
+    for name in games:
+        if name in game.tags:
+            color += name
+
+    return color or 'gray'
+
 class CartridgeImage(Label):
     def __init__(self, cartridge):
         super().__init__()
         self.Cartridge = cartridge
         self.Game = cartridge.Game
 
-        color = ''
-
-        for game in games:
-            if game in self.Game.tags:
-                color += game
-
-        if not color:
-            color = 'gray'
+        color = getCartridgeColor(self.Game)
         
         self.Cartridge.setProperty('color', color)
 
@@ -101,6 +101,42 @@ class EnvironmentComboBox(ComboBox):
     def onTextChanged(self, text):
         self.Settings.set(self.Key, self.GUI.Manager.Environments.Options[text])
 
+class SettingsRow(HBox):
+    def __init__(self, parent, key, label, options):
+        super().__init__(parent.GUI)
+
+        self.Label = self.label(label + ':')
+        self.Label.setAlignment(Qt.AlignRight)
+        self.ComboBox = SettingsComboBox(self, key, options)
+
+        HCenter(self).addTo(parent)
+
+class SettingsComboBox(ComboBox):
+    def __init__(self, parent, key, options):
+        super().__init__()
+        self.GUI = parent.GUI
+        self.Key = key
+        self.Options = options
+        self.Settings = self.GUI.Manager.Settings
+
+        default = self.Settings.get(self.Key)
+        for name, value in self.Options.items():
+            self.addItem(name)
+            if value == default:
+                self.setCurrentText(name)
+
+        self.currentTextChanged.connect(self.onTextChanged)
+        self.GUI.Window.Processing.connect(self.handleProcessing)
+        parent.add(self)
+
+    def handleProcessing(self, processing):
+        self.setEnabled(not processing)
+        self.setProperty('processing', processing)
+        self.updateStyle()
+
+    def onTextChanged(self, text):
+        self.Settings.set(self.Key, self.Options[text])
+
 class PanelHeading(Label):
     def __init__(self, parent, text):
         super().__init__(text)
@@ -209,7 +245,6 @@ class ProcessingOptions(PanelOptionsWidget):
         # TODO:
         # Include Releases when 'Update'
         # Remove from Queue after Processed
-        # Show all logs in status widget (i.e. all build messages)
         buttonContainer = HBox(self.GUI)
         self.SaveDefaultProcesses = PanelButton(buttonContainer, 'Save Current as Default', self.saveDefaultProcesses)
         self.RestoreDefaultProcesses = PanelButton(buttonContainer, 'Restore Default', self.restoreDefaultProcesses)
@@ -220,6 +255,27 @@ class ProcessingOptions(PanelOptionsWidget):
         self.OnlyKeepLatestBuilds = OptionToggle(onlyKeepLatestBuildsContainer, 'Only Keep Latest Builds:', 'OnlyKeepLatestBuilds')
         HCenter(onlyKeepLatestBuildsContainer).addTo(self)
 
+        showLogsContainer = HBox(self.GUI)
+        self.ShowLogs = OptionToggle(showLogsContainer, 'Show All Logs:', 'ShowLogs')
+        HCenter(showLogsContainer).addTo(self)
+
+        sharedObjectsContainer = HBox(self.GUI)
+        self.SharedObjects = OptionToggle(sharedObjectsContainer, 'Shared Git Objects:', 'SharedObjects')
+        HCenter(sharedObjectsContainer).addTo(self)
+
+        jobs = max(os.cpu_count() or 1, self.GUI.Manager.Settings.get('Processing.Jobs'))
+        self.Jobs = SettingsRow(self, 'Processing.Jobs', 'Jobs', { str(i) : i for i in range(1, jobs + 1) })
+        self.NetworkJobs = SettingsRow(self, 'Processing.NetworkJobs', 'Network Jobs', { str(i) : i for i in range(1, 17) })
+        self.RefreshJobs = SettingsRow(self, 'Processing.RefreshJobs', 'Refresh Jobs', { str(i) : i for i in [1, 2, 4, 8, 16, 32] })
+        self.Worktrees = SettingsRow(self, 'Processing.Worktrees', 'Worktree Builds', { 'Disabled' : 0, **{ str(i) : i for i in range(1, 9) } })
+        self.UpdateMode = SettingsRow(self, 'Processing.UpdateMode', 'Update Mode', { 'Fetch' : 'fetch', 'Pull' : 'pull' })
+        self.ShellSessions = SettingsRow(self, 'Processing.ShellSessions', 'Shell Sessions', { 'Reuse' : True, 'New Per Command' : False })
+        self.RemoteCacheTTL = SettingsRow(self, 'Processing.RemoteCacheTTL', 'Remote Cache', { 'Disabled' : 0, '1 min' : 60, '2 min' : 120, '5 min' : 300, '15 min' : 900, '1 hour' : 3600 })
+        self.BuildCacheSize = SettingsRow(self, 'Processing.BuildCacheSize', 'Build Cache', { '64 MB' : 64, '256 MB' : 256, '1 GB' : 1024, '4 GB' : 4096 })
+        self.WatcherMode = SettingsRow(self, 'Watcher.Mode', 'Watch Files', { 'Automatic' : 'auto', 'inotify' : 'inotify', 'Polling' : 'poll', 'Disabled' : 'off' })
+        self.SearchMode = SettingsRow(self, 'Search.Mode', 'Search', { 'In Background' : 'background', 'Every Keystroke' : 'immediate' })
+        self.BrowserMode = SettingsRow(self, 'Browser.Mode', 'Browser (on restart)', { 'Virtual' : 'virtual', 'Widgets' : 'widgets' })
+
     def saveDefaultProcesses(self):
         processes = self.GUI.Process.Options.getSettings()
         self.GUI.Manager.Settings.set("Process", processes)
@@ -1,5 +1,5 @@
-from PyQt5.QtCore import Qt, QModelIndex, QEvent, QTimer, QThread, QCoreApplication, QProcess, QPoint, pyqtSignal, QObject, QUrl, QThreadPool, QRunnable, QMargins, QPoint, QRect, QSize
-from PyQt5.QtWidgets import QWidgetAction, QTreeView, QStyleOptionButton, QGraphicsDropShadowEffect, QDialog, QAction, QMenu, QSlider, QStackedWidget, QLineEdit, QSplashScreen, QComboBox, QHeaderView, QTreeWidgetItem, QFileDialog, QTreeWidget, QApplication, QStyleOption, QStyledItemDelegate, QStyleOptionFrame, QStyle, QLabel, QMainWindow, QLayout, QSizePolicy, QVBoxLayout, QGridLayout, QHBoxLayout, QScrollArea, QWidget
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QEvent, QTimer, QThread, QCoreApplication, QProcess, QPoint, pyqtSignal, QObject, QUrl, QThreadPool, QRunnable, QMargins, QPoint, QRect, QSize
+from PyQt5.QtWidgets import QWidgetAction, QTreeView, QListView, QStyleOptionButton, QGraphicsDropShadowEffect, QDialog, QAction, QMenu, QSlider, QStackedWidget, QLineEdit, QSplashScreen, QComboBox, QHeaderView, QTreeWidgetItem, QFileDialog, QTreeWidget, QApplication, QStyleOption, QStyledItemDelegate, QStyleOptionFrame, QStyle, QLabel, QMainWindow, QLayout, QSizePolicy, QVBoxLayout, QGridLayout, QHBoxLayout, QScrollArea, QWidget
 from PyQt5.QtGui import QPen, QFontMetrics, QPainterPath, QFont, QBrush, QMouseEvent, QColor, QImage, QPixmap, QDesktopServices, QIcon, QPainter
 
 from src.qt.base import *
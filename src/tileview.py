@@ -0,0 +1,229 @@
+from bisect import bisect_left
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QContextMenuEvent
+
+from src.gametile import *
+
+# The games shown in the virtual browser, in the order of the GameIndex
+class GameModel(QAbstractListModel):
+    # above this many changes, the model is reset instead of inserting and removing each row
+    ResetThreshold = 50
+
+    def __init__(self, index):
+        super().__init__()
+        self.Index = index
+        self.Games = []
+        self.Positions = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.Games)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid():
+            game = self.Games[index.row()]
+
+            if role == Qt.DisplayRole:
+                return game.FullTitle
+
+            if role == Qt.UserRole:
+                return game
+
+    # the row of the game, and if it is shown at that row
+    def row(self, game):
+        position = self.Index.position(game)
+        row = bisect_left(self.Positions, position)
+        return row, row < len(self.Positions) and self.Positions[row] == position
+
+    def update(self, hide, show, bits):
+        if len(hide) + len(show) > self.ResetThreshold:
+            self.beginResetModel()
+            self.Games = self.Index.games(bits)
+            self.Positions = [self.Index.position(game) for game in self.Games]
+            self.endResetModel()
+            return
+
+        for game in hide:
+            row, found = self.row(game)
+            if found:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.Games[row]
+                del self.Positions[row]
+                self.endRemoveRows()
+
+        for game in show:
+            row, found = self.row(game)
+            if not found:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self.Games.insert(row, game)
+                self.Positions.insert(row, self.Index.position(game))
+                self.endInsertRows()
+
+    # repaint the tile of the game whenever any of its painted flags change
+    def watch(self, game):
+        for key in ['Library', 'Excluding', 'Favorites', 'Outdated', 'Processing']:
+            game.on(key, self.onGameChanged, False)
+
+    def onGameChanged(self, *args):
+        self.changed(self.sender())
+
+    def changed(self, game):
+        row, found = self.row(game)
+        if found:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+# Paints each game like a GameTile, so only the visible games are drawn and no widgets are created per game
+class GameTileDelegate(QStyledItemDelegate):
+    Size = QSize(144, 164)
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.Labels = {}
+        self.Favorites = Scaled(20, 'assets/images/favorites.png')
+        self.FavoritesFaded = Faded(self.Favorites)
+        self.Outdated = Scaled(25, 'assets/images/outdated.png')
+
+        self.Font = QFont()
+        self.Font.setPixelSize(10)
+        self.Font.setWeight(QFont.DemiBold)
+
+    def sizeHint(self, option, index):
+        return self.Size
+
+    # the boxart of a game is only loaded once it is first painted
+    def getLabel(self, game):
+        if game not in self.Labels:
+            self.Labels[game] = LabelPixmap(game)
+
+        return self.Labels[game]
+
+    # the background color and border width, matching the GameTile styles
+    def getFrame(self, gameGUI, hover):
+        border = 1 if gameGUI.isActive else 2 if gameGUI.isQueued else 0
+
+        if gameGUI.Game.Processing:
+            color = '#226592' if hover else '#1b5780'
+        elif gameGUI.isActive:
+            color = '#606060' if hover else '#555555'
+        elif gameGUI.isQueued:
+            color = '#5a5a5a' if hover else '#464646'
+        else:
+            color = '#3a3a3b' if hover else None
+
+        return color, border
+
+    def getTitleColor(self, game):
+        if game.Excluding and not game.Library:
+            return '#5f5f5f'
+
+        if game.Excluding or not game.Library:
+            return '#7f7f7f'
+
+        return '#ffffff'
+
+    def paint(self, painter, option, index):
+        game = index.data(Qt.UserRole)
+        rect = option.rect
+        x, y = rect.x(), rect.y()
+
+        painter.save()
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+
+        color, border = self.getFrame(game.GUI, bool(option.state & QStyle.State_MouseOver))
+        if color:
+            painter.setBrush(QColor(color))
+            painter.setPen(QPen(QColor('#000000'), border) if border else Qt.NoPen)
+            painter.drawRoundedRect(QRectF(rect).adjusted(border / 2, border / 2, -border / 2, -border / 2), 10, 10)
+
+        cartridge = getCartridgePixmap(getCartridgeColor(game))
+        pixmap = cartridge if game.Library else cartridge.Darkened
+        if game.Excluding:
+            pixmap = pixmap.Faded
+        painter.drawPixmap(x + (rect.width() - pixmap.width()) // 2, y + (rect.height() - pixmap.height()) // 2, pixmap)
+
+        label = self.getLabel(game)
+        painter.drawPixmap(x + 26, y + 48, label.Faded if game.Excluding else label)
+        painter.setBrush(Qt.NoBrush)
+        painter.setPen(QPen(QColor('#000000'), 1))
+        painter.drawRoundedRect(QRectF(x + 25.5, y + 47.5, 93, 93), 5, 5)
+
+        # the title is outlined in black, like the OutlineShadow of the GameTileTitle
+        title = QRect(x + 22, y + 16, 100, 25)
+        flags = Qt.AlignCenter | Qt.TextWordWrap
+        painter.setFont(self.Font)
+        painter.setPen(QColor('#000000'))
+        for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+            painter.drawText(title.translated(dx, dy), flags, game.FullTitle)
+        painter.setPen(QColor(self.getTitleColor(game)))
+        painter.drawText(title, flags, game.FullTitle)
+
+        if game.Favorites:
+            painter.drawPixmap(x, y + 5, self.FavoritesFaded if game.Excluding else self.Favorites)
+
+        if game.Outdated:
+            painter.drawPixmap(x + 114, y + 134, self.Outdated)
+
+        painter.restore()
+
+# The browser as a single list view over the shown games, instead of a GameTile widget per game
+# The model is only changed through its signals, so the changes from the worker and watcher threads are queued to the GUI thread
+class TileView(QListView):
+    ApplySignal = pyqtSignal(object, object, object)
+    ChangedSignal = pyqtSignal(object)
+
+    def __init__(self, parent):
+        super().__init__()
+        self.GUI = parent.GUI
+        self.GameGUI = None
+        # the list view is its own scroll area
+        self.Scroll = self
+
+        self.Model = GameModel(self.GUI.Manager.GameIndex)
+        self.setModel(self.Model)
+        # always queued, so the updates are made in the order they were computed on any thread
+        self.ApplySignal.connect(self.Model.update, Qt.QueuedConnection)
+        self.ChangedSignal.connect(self.Model.changed)
+        self.setItemDelegate(GameTileDelegate(self))
+
+        self.setViewMode(QListView.IconMode)
+        self.setMovement(QListView.Static)
+        self.setResizeMode(QListView.Adjust)
+        self.setUniformItemSizes(True)
+        self.setSpacing(4)
+        self.setSelectionMode(QListView.NoSelection)
+        self.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WA_Hover)
+        self.setObjectName('Tiles')
+
+        parent.add(self, 95)
+
+    def apply(self, hide, show, bits):
+        # the games are copied, since the lists might be changed before a queued update is made
+        self.ApplySignal.emit(list(hide), list(show), bits)
+
+    def watch(self, game):
+        self.Model.watch(game)
+
+    def changed(self, game):
+        self.ChangedSignal.emit(game)
+
+    def getData(self):
+        return [self.GameGUI.Game]
+
+    def gameAt(self, pos):
+        index = self.indexAt(pos)
+        return index.data(Qt.UserRole) if index.isValid() else None
+
+    def mousePressEvent(self, event):
+        game = self.gameAt(event.pos())
+        if game and event.button() == Qt.LeftButton:
+            self.GUI.Panel.setActive(game.GUI)
+
+    def contextMenuEvent(self, event):
+        game = self.gameAt(event.pos())
+        if game:
+            self.GameGUI = game.GUI
+            # the event is relative to the viewport, but the menu is placed relative to the view
+            GameContextMenu(self, QContextMenuEvent(event.reason(), self.viewport().mapTo(self, event.pos())))